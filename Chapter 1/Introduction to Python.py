@@ -160,6 +160,93 @@ Python also provides the `math` module for more advanced mathematical functions,
 
 
 
+======================================================================================
+
+Command line tools with fast startup (lazy imports)?
+
+- **The Problem:** A command line tool built on `sys.argv` pays for every `import` at the top of its files each time it starts, even for subcommands the user did not ask for. Many small tools that each take half a second to start add up quickly.
+
+- **One Entry Point with Subcommands:** A package with a `__main__.py` file can be run with `python -m package_name`. The main file only maps subcommand names to module names and imports the chosen module with `importlib.import_module()` when it is needed. Heavy modules (`json`, `csv`, `concurrent.futures`, ...) are imported inside the subcommand, not at the top.
+
+  Example:
+  ```python
+  # chapters_cli/__main__.py
+  import sys
+
+  COMMANDS = {
+      'search': ('chapters_cli.search', 'Search the chapters'),
+      'run-examples': ('chapters_cli.run_examples', 'Run every code example'),
+      'bench': ('chapters_cli.bench', 'Run the collection benchmarks'),
+      'render': ('chapters_cli.render', 'Render the chapters to HTML'),
+  }
+
+  def startup_profile(argv, top=10):
+      import subprocess
+      result = subprocess.run([sys.executable, '-X', 'importtime', '-m', 'chapters_cli', *argv],
+                              capture_output=True, text=True)
+      print(result.stdout, end='')  # The command's own output, as if it ran without profiling
+      rows = []
+      for line in result.stderr.splitlines():
+          fields = line.removeprefix('import time:').split('|')
+          if line.startswith('import time:') and fields[0].strip().isdigit():
+              rows.append((int(fields[1]), int(fields[0]), fields[2].rstrip()))
+          elif not line.startswith('import time:'):
+              print(line, file=sys.stderr)  # Error messages of the command
+      print('%10s %10s  %s' % ('self [us]', 'total [us]', 'module'), file=sys.stderr)
+      for total, own, name in sorted(rows, reverse=True)[:top]:
+          print('%10d %10d  %s' % (own, total, name), file=sys.stderr)
+      print('All imports: %.1f ms' % (sum(own for total, own, name in rows) / 1000), file=sys.stderr)
+      return result.returncode
+
+  def main(argv):
+      if '--startup-profile' in argv:
+          argv.remove('--startup-profile')
+          return startup_profile(argv)
+      if not argv or argv[0] not in COMMANDS:
+          print('usage: python -m chapters_cli [--startup-profile] {%s} ...' % ','.join(COMMANDS))
+          for name, (module, help_text) in COMMANDS.items():
+              print('  %-14s %s' % (name, help_text))
+          return 2
+      import importlib
+      module = importlib.import_module(COMMANDS[argv[0]][0])  # Only the chosen subcommand is imported
+      return module.main(argv[1:])
+
+  if __name__ == '__main__':
+      sys.exit(main(sys.argv[1:]))
+  ```
+
+  Each subcommand lives in its own module with a `main(argv)` function:
+  ```python
+  # chapters_cli/search.py
+  import argparse
+  import glob
+  import re
+
+  def main(argv):
+      parser = argparse.ArgumentParser(prog='python -m chapters_cli search')
+      parser.add_argument('word')
+      parser.add_argument('--limit', type=int, default=5)
+      args = parser.parse_args(argv)
+
+      pattern = re.compile(re.escape(args.word), re.IGNORECASE)
+      counts = []
+      for path in glob.glob('Chapter */*.py'):
+          with open(path, 'r', encoding='utf-8') as file:
+              counts.append((len(pattern.findall(file.read())), path))
+      for count, path in sorted(counts, reverse=True)[:args.limit]:
+          print(count, path)
+  ```
+
+- **Measuring Startup Time:** `python -X importtime` prints how long every import took (in microseconds) to standard error. The `--startup-profile` flag above runs the tool again with that option, passes on its output and exit code, and shows the slowest imports on standard error.
+
+  Example:
+  ```bash
+  python -m chapters_cli search generator
+  python -m chapters_cli --startup-profile search generator
+  ```
+
+- **Tips:** Keep the top of `__main__.py` down to `sys`. The interpreter itself has a fixed startup cost (compare with `python -c pass`), so the goal is that the tool adds only a few milliseconds on top of it; on a typical machine that keeps the whole start under 50 ms.
+
 ======================================================================================
 
 """
@@ -188,4 +188,105 @@ These constructs are great for creating new sequences from existing iterables wi
 
 ======================================================================================
 
+TODO:Measuring the speed and memory of collections (timeit, tracemalloc)?
+
+The sections above say that a `deque` "supports fast appends and pops from both ends" and that generator expressions are "saving memory". The `timeit` and `tracemalloc` modules let you measure these claims instead of taking them on trust.
+
+### **Tools:**
+
+- **`timeit.Timer(stmt, setup, globals=...)`:** Runs a statement many times and returns the total time. `autorange()` picks a number of runs that takes at least 0.2 seconds.
+- **`tracemalloc`:** Traces memory allocations. `tracemalloc.get_traced_memory()` returns the current and **peak** memory in bytes.
+- **Sizes:** Measure every operation at several sizes (`10`, `100`, ... `10**7`) to see how it scales: `deque.popleft()` stays constant, `list.pop(0)` grows with the size of the list.
+
+### **The Benchmark Suite:**
+
+- Each benchmark is a `(setup, statement)` pair; `n` is the size of the collection.
+  ```python
+  import json
+  import timeit
+  import tracemalloc
+  from array import array
+  from collections import deque
+
+  BENCHMARKS = {
+      'list insert/pop front': ('data = list(range(n))', 'data.insert(0, 1); data.pop(0)'),
+      'list append/pop end': ('data = list(range(n))', 'data.append(1); data.pop()'),
+      'deque appendleft/popleft': ('data = deque(range(n))', 'data.appendleft(1); data.popleft()'),
+      'set union': ('a = set(range(n)); b = set(range(n // 2, n + n // 2))', 'a | b'),
+      'set intersection': ('a = set(range(n)); b = set(range(n // 2, n + n // 2))', 'a & b'),
+      'dict get': ('data = dict.fromkeys(range(n), 0); key = n // 2', 'data.get(key)'),
+      'array append': ("data = array('i', range(n))", 'data.append(1)'),
+      'list comprehension sum': ('', 'sum([x * x for x in range(n)])'),
+      'generator expression sum': ('', 'sum(x * x for x in range(n))'),
+  }
+
+  def measure(name, n, repeat=3):
+      setup, statement = BENCHMARKS[name]
+      namespace = {'n': n, 'array': array, 'deque': deque}
+      exec(setup, namespace)
+      timer = timeit.Timer(statement, globals=namespace)
+      number, _ = timer.autorange()
+      seconds = min(timer.repeat(repeat=repeat, number=number)) / number
+
+      namespace = {'n': n, 'array': array, 'deque': deque}
+      code = compile(statement, name, 'exec')  # Compile before tracing
+      tracemalloc.start()
+      exec(setup, namespace)
+      setup_bytes = tracemalloc.get_traced_memory()[0]
+      tracemalloc.reset_peak()
+      exec(code, namespace)
+      peak_bytes = tracemalloc.get_traced_memory()[1] - setup_bytes
+      tracemalloc.stop()
+      return {'benchmark': name, 'size': n, 'seconds': seconds,
+              'setup_bytes': setup_bytes, 'peak_bytes': max(peak_bytes, 0)}
+
+  def run_suite(sizes, names=BENCHMARKS, path='bench_results.json'):
+      results = [measure(name, n) for name in names for n in sizes]
+      with open(path, 'w') as file:
+          json.dump(results, file, indent=4)
+      return results
+  ```
+
+### **Comparing Against a Baseline:**
+
+- Save one run as the baseline, then compare every new run with it. A benchmark that became more than `tolerance` slower is a **regression**.
+  ```python
+  def compare(results, baseline_path='bench_baseline.json', tolerance=0.25):
+      with open(baseline_path) as file:
+          baseline = {(r['benchmark'], r['size']): r for r in json.load(file)}
+      regressions = []
+      for result in results:
+          old = baseline.get((result['benchmark'], result['size']))
+          if old and result['seconds'] > old['seconds'] * (1 + tolerance):
+              regressions.append((result['benchmark'], result['size'], result['seconds'] / old['seconds']))
+      return regressions
+  ```
+
+### **Example:**
+
+```python
+import os
+
+sizes = [10 ** k for k in range(1, 5)]  # Use range(1, 8) for sizes up to 10**7
+results = run_suite(sizes)
+for result in results:
+    print('%-26s n=%-7d %10.1f ns %12d bytes' % (result['benchmark'], result['size'],
+                                                 result['seconds'] * 1e9, result['peak_bytes']))
+
+if not os.path.exists('bench_baseline.json'):
+    os.replace('bench_results.json', 'bench_baseline.json')  # First run becomes the baseline
+else:
+    for name, size, ratio in compare(results):
+        print('Regression: %s at n=%d is %.2fx slower' % (name, size, ratio))
+```
+
+- **Typical results:**
+  - `list insert/pop front` gets slower as `n` grows, while `deque appendleft/popleft` stays flat.
+  - `dict get` and `array append` stay flat; `set union` and `set intersection` grow with `n`.
+  - `list comprehension sum` needs memory proportional to `n`, `generator expression sum` needs almost none.
+
+Measuring with `timeit` and `tracemalloc` at several sizes turns statements about performance into numbers you can compare from run to run.
+
+======================================================================================
+
 """
\ No newline at end of file
@@ -634,4 +634,111 @@ pip install flask
 
 ======================================================================================
 
+TODO:Loading parts of a large module lazily (without importing it)?
+
+### **Why Not Import It?**
+- Importing a module compiles and runs the whole file. For the chapters of this course that means the entire docstring (tens of kilobytes) is decoded and kept in memory as `__doc__`, even when a tool needs only one `TODO:` section.
+- The chapter files also have spaces in their names (`Regular Expressions.py`), so they cannot be imported with a normal `import` statement anyway.
+- **Lazy loading**: Build a small **index** of where each section starts and ends (byte offsets), then `seek()` to a section and decode only that section when it is requested.
+
+### **Building the Section Index:**
+- Read the file once in binary mode, line by line, and keep track of the byte offset.
+- Save the index next to a cache key (modification time and size), so it is rebuilt only when the file changes.
+
+**Example:**
+```python
+import json
+import os
+
+def index_sections(path):
+    sections, title, start, offset = [], None, 0, 0
+    with open(path, 'rb') as file:
+        for line in file:
+            stripped = line.strip()
+            if stripped.startswith(b'==========') and not stripped.strip(b'='):
+                if title:
+                    sections.append([title, start, offset])
+                title, start = None, offset + len(line)
+            elif title is None and stripped.strip(b'"'):
+                title = stripped.strip(b'"').decode('utf-8').removeprefix('TODO:')
+            offset += len(line)
+    if title:
+        sections.append([title, start, offset])
+    return sections
+```
+
+### **A Lazy Chapter Object:**
+- `LazyChapter` behaves like a read-only dictionary (`collections.abc.Mapping`): the keys are section titles, and a value is read from disk only when you access it.
+- Listing the titles never reads the sections themselves.
+
+**Example:**
+```python
+from collections.abc import Mapping
+
+class LazyChapter(Mapping):
+    def __init__(self, path, cache_dir='.section_index'):
+        self.path = path
+        stat = os.stat(path)
+        key = [stat.st_mtime_ns, stat.st_size]
+        index_path = os.path.join(cache_dir, os.path.basename(path) + '.json')
+        try:
+            with open(index_path, 'r') as file:
+                saved = json.load(file)
+        except (FileNotFoundError, ValueError):
+            saved = {}
+        if saved.get('key') != key:
+            saved = {'key': key, 'sections': index_sections(path)}
+            os.makedirs(cache_dir, exist_ok=True)
+            with open(index_path, 'w') as file:
+                json.dump(saved, file)
+        self.offsets = {title: (start, end) for title, start, end in saved['sections']}
+
+    def __getitem__(self, title):
+        start, end = self.offsets[title]
+        with open(self.path, 'rb') as file:
+            file.seek(start)
+            return file.read(end - start).decode('utf-8').strip()
+
+    def __iter__(self):
+        return iter(self.offsets)
+
+    def __len__(self):
+        return len(self.offsets)
+```
+
+### **Using It:**
+```python
+chapter = LazyChapter('Chapter 7/Regular Expressions.py')
+print(list(chapter)[:3])  # Section titles, read from the small index
+print(chapter['Grouping and capturing?'][:60])  # Reads only this section from disk
+```
+
+### **Comparing Memory Use:**
+- `tracemalloc` shows the difference between running the whole module and reading one section.
+```python
+import tracemalloc
+
+path = 'Chapter 7/Regular Expressions.py'
+
+tracemalloc.start()
+namespace = {}
+with open(path, 'r', encoding='utf-8') as file:
+    exec(compile(file.read(), path, 'exec'), namespace)  # What importing does
+print('Whole module:', tracemalloc.get_traced_memory()[1], 'bytes')
+tracemalloc.stop()
+
+tracemalloc.start()
+section = LazyChapter(path)['Grouping and capturing?']
+print('One section: ', tracemalloc.get_traced_memory()[1], 'bytes')
+tracemalloc.stop()
+```
+- The first number grows with the size of the file; the second one depends only on the size of the section you read, so memory stays flat as more chapters and sections are added.
+
+### **Summary:**
+- **Importing** a module runs it and keeps everything it defines in memory.
+- **Lazy loading** keeps a small index of byte offsets, uses `seek()` and `read()` to load one part on demand, and rebuilds the index only when the file changes.
+- A `Mapping` subclass gives lazy data a familiar dictionary interface.
+
+======================================================================================
+
 """
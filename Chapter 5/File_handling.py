@@ -550,5 +550,2640 @@ except PermissionError:
 - **`finally`:** Use for cleanup actions like closing files.
 - **`with` Statement:** Preferred method for file operations to handle exceptions and ensure files are closed automatically.
 
+======================================================================================
+
+TODO:Reading large CSV files in parallel?
+
+### **Reading Large CSV Files in Parallel:**
+
+The `csv.reader` loop from "Working with CSV and JSON files" reads one row after another on a single CPU core. For exports of several gigabytes, the file can be split into **byte ranges** that are parsed by several processes at the same time.
+
+### **1. Splitting a CSV File into Chunks:**
+
+- A chunk must start at the beginning of a row, so every split point is moved forward to the byte after the next newline.
+- **Quote-aware:** A quoted field can contain newlines (`"line 1\nline 2"`). A newline only ends a row when it is outside quotes, i.e. when the number of `"` characters before it is even. Escaped quotes (`""`) count twice, so they do not change the result.
+- `mmap` lets us count quotes and search for newlines without reading the file into a Python string.
+
+**Example:**
+```python
+import mmap
+import os
+
+def next_row_start(data, position, inside_quotes):
+    while True:
+        newline = data.find(b'\n', position)
+        if newline == -1:
+            return len(data)
+        inside_quotes ^= data[position:newline].count(b'"') & 1
+        if not inside_quotes:
+            return newline + 1
+        position = newline + 1
+
+def split_rows(path, chunk_size=16 * 1024 * 1024):
+    size = os.path.getsize(path)
+    if size == 0:
+        return []
+    with open(path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+        ranges, start, quotes_before = [], 0, 0
+        while start < size:
+            target = min(start + chunk_size, size)
+            quotes_before += data[start:target].count(b'"')  # Quotes between start and target
+            end = next_row_start(data, target, quotes_before & 1) if target < size else size
+            quotes_before += data[target:end].count(b'"')
+            ranges.append((start, end))
+            start = end
+    return ranges
+```
+
+### **2. Parsing the Chunks in a Process Pool:**
+
+- Each worker opens the file, reads only its own byte range and parses it with the normal `csv.reader`.
+- `executor.submit()` keeps only a few chunks in flight at once, so memory stays bounded, and the results are yielded **in the original order** of the file.
+- An optional `process` function runs inside the worker (e.g. to filter rows or sum a column), so that less data has to be sent back to the main process.
+
+**Example:**
+```python
+import csv
+import io
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+def parse_range(path, start, end, process=None):
+    with open(path, 'rb') as file:
+        file.seek(start)
+        text = file.read(end - start).decode('utf-8')
+    rows = list(csv.reader(io.StringIO(text, newline='')))
+    return process(rows) if process else rows
+
+def read_csv_parallel(path, workers=None, chunk_size=16 * 1024 * 1024, process=None):
+    workers = workers or os.cpu_count()
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        for start, end in split_rows(path, chunk_size):
+            pending.append(executor.submit(parse_range, path, start, end, process))
+            if len(pending) > 2 * workers:
+                yield from pending.popleft().result()
+        while pending:
+            yield from pending.popleft().result()
+```
+
+### **3. Throughput Benchmark:**
+
+**Example:**
+```python
+import time
+
+def sum_ages(rows):
+    return [sum(int(row[1]) for row in rows)]
+
+if __name__ == '__main__':
+    with open('big.csv', 'w', newline='') as file:
+        writer = csv.writer(file)
+        for i in range(1_000_000):
+            writer.writerow(['Alice %d' % i, i % 90, 'New York, "NY"\nUSA' if i % 1000 == 0 else 'Los Angeles'])
+    size = os.path.getsize('big.csv') / 1024 / 1024
+
+    start = time.perf_counter()
+    with open('big.csv', 'r', newline='') as file:
+        expected = list(csv.reader(file))
+    serial = time.perf_counter() - start
+    print('csv.reader:        %6.1f MB/s' % (size / serial))
+
+    start = time.perf_counter()
+    rows = list(read_csv_parallel('big.csv', chunk_size=4 * 1024 * 1024))
+    parallel = time.perf_counter() - start
+    print('read_csv_parallel: %6.1f MB/s' % (size / parallel))
+    print('Same rows:', rows == expected)  # Output: Same rows: True
+
+    start = time.perf_counter()
+    total = sum(read_csv_parallel('big.csv', chunk_size=4 * 1024 * 1024, process=sum_ages))
+    print('Sum in workers:    %6.1f MB/s' % (size / (time.perf_counter() - start)))
+```
+
+- Sending every row back to the main process costs time (the rows are pickled), so the biggest speedups come when the work is done inside the workers with `process`.
+
+### **Summary:**
+
+- **Split** the file into byte ranges that start at a row boundary; count quotes so that newlines inside quoted fields are not used as split points.
+- **Parse** the ranges in a `ProcessPoolExecutor` with a limited number of chunks in flight.
+- **Yield** the results in the original order, and do as much work as possible inside the workers.
+
+======================================================================================
+
+TODO:Reading only the CSV columns you need (typed, column-projected reader)?
+
+### **Reading Only the CSV Columns You Need:**
+
+`csv.DictReader` builds a new dictionary of strings for every row, with one entry per column, even if the program only uses `row['Name']` and `row['Age']`. For wide files with millions of rows, those dictionaries take most of the time and memory. A faster reader:
+
+- **Projects** the columns: keeps only the selected fields of each row.
+- **Converts** only those fields, using a **schema** (`{'Age': int}`) or a schema inferred from the first rows.
+- **Returns** rows as tuples, or whole columns as compact `array` buffers.
+
+### **1. A Column-Projected Reader:**
+
+- `operator.itemgetter(2, 5)` picks fields 2 and 5 from a row in C, without a Python loop.
+- The first rows are kept as a **sample** to infer the type of each column: `int` if every value converts to `int`, then `float`, otherwise `str`.
+
+**Example:**
+```python
+import csv
+from array import array
+from itertools import chain, islice
+from operator import itemgetter
+
+def infer_type(values):
+    for kind in (int, float):
+        try:
+            for value in values:
+                kind(value)
+            return kind
+        except ValueError:
+            continue
+    return str
+
+class ProjectedReader:
+    def __init__(self, file, columns, schema=None, sample_size=100):
+        self.reader = csv.reader(file)
+        header = next(self.reader)
+        self.columns = list(columns)
+        indexes = [header.index(column) for column in self.columns]
+        self.sample = list(islice(self.reader, sample_size))
+        if len(indexes) > 1:
+            self.get = itemgetter(*indexes)
+        else:
+            self.get = lambda row, index=indexes[0]: (row[index],)
+        schema = dict(schema or {})
+        for column, index in zip(self.columns, indexes):
+            if column not in schema:
+                schema[column] = infer_type([row[index] for row in self.sample])
+        self.types = [schema[column] for column in self.columns]
+
+    def __iter__(self):
+        get, types = self.get, self.types
+        rows = chain(self.sample, self.reader)
+        if all(kind is str for kind in types):
+            return map(get, rows)  # Nothing to convert
+        return (tuple([kind(value) for kind, value in zip(types, get(row))]) for row in rows)
+
+    def to_columns(self):
+        codes = {int: 'q', float: 'd'}
+        columns = {column: array(codes[kind]) if kind in codes else []
+                   for column, kind in zip(self.columns, self.types)}
+        appends = [columns[column].append for column in self.columns]
+        for values in self:
+            for append, value in zip(appends, values):
+                append(value)
+        return columns
+```
+
+**Usage:**
+```python
+with open('data.csv', 'w', newline='') as file:
+    writer = csv.writer(file)
+    writer.writerow(['Name', 'Age', 'City'])
+    writer.writerow(['Alice', 30, 'New York'])
+    writer.writerow(['Bob', 25, 'Los Angeles'])
+
+with open('data.csv', 'r', newline='') as file:
+    for name, age in ProjectedReader(file, ['Name', 'Age']):
+        print(name, age + 1)  # Age is already an int
+
+with open('data.csv', 'r', newline='') as file:
+    columns = ProjectedReader(file, ['Age'], schema={'Age': int}).to_columns()
+print(columns)  # Output: {'Age': array('q', [30, 25])}
+```
+
+### **2. Columnar Buffers for NumPy (Optional):**
+
+- An `array` stores numbers as raw machine values (8 bytes each for `'q'` and `'d'`) instead of one Python object per value.
+- If NumPy is installed, `numpy.frombuffer()` turns the array into a NumPy array **without copying** it.
+
+**Example:**
+```python
+try:
+    import numpy
+except ImportError:
+    numpy = None
+
+if numpy is not None:
+    ages = numpy.frombuffer(columns['Age'], dtype=numpy.int64)
+    print(ages.mean())  # Output: 27.5
+```
+
+### **3. Comparing with `csv.DictReader`:**
+
+**Example:**
+```python
+import time
+import tracemalloc
+
+header = ['Name', 'Age', 'City', 'Email', 'Phone', 'Street', 'Zip', 'Country', 'Score', 'Notes']
+with open('wide.csv', 'w', newline='') as file:
+    writer = csv.writer(file)
+    writer.writerow(header)
+    for i in range(200_000):
+        writer.writerow(['Name %d' % i, i % 90, 'City', 'x@example.com', '555-0100',
+                         'Main Street 1', '10001', 'USA', i * 0.5, 'some notes'])
+
+def measure(label, load):
+    tracemalloc.start()
+    start = time.perf_counter()
+    with open('wide.csv', 'r', newline='') as file:
+        result = load(file)
+    seconds = time.perf_counter() - start
+    peak = tracemalloc.get_traced_memory()[1]
+    tracemalloc.stop()
+    print('%-22s %6.2f s %8.1f MB' % (label, seconds, peak / 1024 / 1024))
+
+measure('DictReader (all rows)', lambda file: list(csv.DictReader(file)))
+measure('DictReader', lambda file: [(row['Name'], int(row['Age'])) for row in csv.DictReader(file)])
+measure('ProjectedReader', lambda file: list(ProjectedReader(file, ['Name', 'Age'])))
+measure('ProjectedReader array', lambda file: ProjectedReader(file, ['Age', 'Score']).to_columns())
+```
+
+- Keeping the dictionaries from `DictReader` costs by far the most memory. The projected reader never builds a dictionary per row, and the columnar version stores each number in 8 bytes instead of a full Python object.
+
+### **Summary:**
+
+- **Project** only the columns you need with `operator.itemgetter`.
+- **Convert** only those fields, with a given schema or one inferred from a sample of rows.
+- **Store** numeric columns in `array` buffers, which NumPy can use without copying.
+
+======================================================================================
+
+TODO:Streaming very large JSON files?
+
+### **Streaming Very Large JSON Files:**
+
+`json.load(file)` reads the whole document and builds every Python object at once, so a file of tens of gigabytes needs even more memory than that. Most large JSON files are one big array of similar records, e.g. `{"meta": {...}, "records": [{...}, {...}, ...]}`. A **streaming parser** reads the file in fixed-size buffers and yields the records one at a time:
+
+- **Path:** Records are selected with a path like `records.item` (the items of the array under the key `records`) or `item` (the items of a top-level array).
+- **Bounded memory:** Only the current buffer and the current record are in memory.
+- **Checkpoints:** After each record the parser knows its byte offset in the file, so a job that stops can **resume** from that offset instead of starting again.
+
+### **1. The Stream:**
+
+- Bytes are read with `file.read(buffer_size)` and decoded with an incremental UTF-8 decoder, so a character split between two buffers is handled correctly.
+- Whole values (a record, a key, a number) are decoded with `json.JSONDecoder().raw_decode()`, which is written in C. If a value is cut off at the end of the buffer, more data is read and the value is decoded again; the amount read grows each time, so large records do not cause repeated work.
+- Values that are not on the path (like `meta`) are **skipped** by counting brackets with a regular expression, without building them.
+
+**Example:**
+```python
+import codecs
+import json
+import re
+
+WHITESPACE = re.compile(r'[ \t\n\r]*')
+STRUCTURE = re.compile(r'[]"{}[]')
+STRING_REST = re.compile(r'[^"\\]*(?:\\.[^"\\]*)*"', re.S)
+NUMBER_TAIL = re.compile(r'[0-9.eE+-]*')
+DECODER = json.JSONDecoder()
+
+class JSONStream:
+    def __init__(self, file, buffer_size=64 * 1024, offset=0):
+        file.seek(offset)
+        self.file, self.buffer_size = file, buffer_size
+        self.decoder = codecs.getincrementaldecoder('utf-8')()
+        self.data, self.pos, self.counted = '', 0, 0
+        self.offset = offset  # Byte position of self.data[self.counted] in the file
+
+    def byte_length(self, text):
+        return len(text) if text.isascii() else len(text.encode('utf-8'))
+
+    def tell(self):
+        self.offset += self.byte_length(self.data[self.counted:self.pos])
+        self.counted = self.pos
+        return self.offset
+
+    def fill(self, size=None):
+        self.tell()
+        self.data, self.pos, self.counted = self.data[self.pos:], 0, 0  # Forget what was already parsed
+        chunk = self.file.read(size or self.buffer_size)
+        self.data += self.decoder.decode(chunk, final=not chunk)
+        return bool(chunk)
+
+    def peek(self):
+        while True:
+            self.pos = WHITESPACE.match(self.data, self.pos).end()
+            if self.pos < len(self.data):
+                return self.data[self.pos]
+            if not self.fill():
+                raise ValueError('Unexpected end of JSON at byte %d' % self.tell())
+
+    def expect(self, characters):
+        character = self.peek()
+        if character not in characters:
+            raise ValueError('Expected one of %r at byte %d, found %r' % (characters, self.tell(), character))
+        self.pos += 1
+        return character
+
+    def value(self):
+        self.peek()
+        while True:
+            try:
+                value, end = DECODER.raw_decode(self.data, self.pos)
+            except json.JSONDecodeError:
+                if not self.fill(max(self.buffer_size, len(self.data))):
+                    raise
+                continue
+            if (type(value) in (int, float) and NUMBER_TAIL.fullmatch(self.data, end)
+                    and self.fill(max(self.buffer_size, len(self.data)))):
+                continue  # A number like 12 or 1.5 may continue in the next buffer
+            self.pos = end
+            return value
+
+    def skip(self):
+        if self.peek() not in '{[':
+            self.value()
+            return
+        depth = 0
+        while True:
+            match = STRUCTURE.search(self.data, self.pos)
+            if match is None:
+                self.pos = len(self.data)
+                if not self.fill():
+                    raise ValueError('Unexpected end of JSON at byte %d' % self.tell())
+                continue
+            if match.group() == '"':
+                rest = STRING_REST.match(self.data, match.end())
+                if rest is None:  # The string continues in the next buffer
+                    self.pos = match.start()
+                    if not self.fill(max(self.buffer_size, len(self.data))):
+                        raise ValueError('Unterminated string at byte %d' % self.tell())
+                    continue
+                self.pos = rest.end()
+                continue
+            self.pos = match.end()
+            depth += 1 if match.group() in '{[' else -1
+            if depth == 0:
+                return
+
+    def find_array(self, path):
+        *keys, last = path.split('.')
+        if last != 'item':
+            raise ValueError('The path must end with "item", e.g. "records.item"')
+        for key in keys:
+            self.expect('{')
+            while True:
+                if self.peek() == '}':
+                    raise KeyError(key)
+                name = self.value()
+                self.expect(':')
+                if name == key:
+                    break
+                self.skip()
+                if self.expect(',}') == '}':
+                    raise KeyError(key)
+        self.expect('[')
+
+    def items(self):
+        if self.peek() == ']':
+            self.pos += 1
+            return
+        while True:
+            yield self.value()
+            if self.expect(',]') == ']':
+                return
+
+    def resumed_items(self):
+        while self.expect(',]') == ',':
+            yield self.value()
+```
+
+### **2. Reading Items with Checkpoints:**
+
+- `stream_items()` yields every item together with the byte offset right after it. Saving that offset is enough to resume later.
+
+**Example:**
+```python
+def stream_items(file, path, checkpoint=None, buffer_size=64 * 1024):
+    if checkpoint is None:
+        stream = JSONStream(file, buffer_size)
+        stream.find_array(path)
+        items = stream.items()
+    else:
+        stream = JSONStream(file, buffer_size, offset=checkpoint)
+        items = stream.resumed_items()
+    for item in items:
+        yield item, stream.tell()
+```
+
+### **3. Example:**
+
+```python
+import tracemalloc
+
+with open('dump.json', 'w', encoding='utf-8') as file:
+    file.write('{"meta": {"source": "export", "tags": ["a", "[b]", "{c}"]},\n "records": [\n')
+    for i in range(200_000):
+        record = {'name': 'Alice %d' % i, 'age': i % 90, 'city': 'Zürich' if i % 7 else 'New York'}
+        file.write(('' if i == 0 else ',\n') + json.dumps(record, ensure_ascii=False))
+    file.write('\n]}\n')
+
+tracemalloc.start()
+with open('dump.json', 'rb') as file:
+    total_age = sum(record['age'] for record, offset in stream_items(file, 'records.item'))
+print('Streaming: total age %d, peak %.1f MB' % (total_age, tracemalloc.get_traced_memory()[1] / 1e6))
+tracemalloc.stop()
+
+tracemalloc.start()
+with open('dump.json', 'rb') as file:
+    total_age = sum(record['age'] for record in json.load(file)['records'])
+print('json.load: total age %d, peak %.1f MB' % (total_age, tracemalloc.get_traced_memory()[1] / 1e6))
+tracemalloc.stop()
+
+# Stop after 1000 records, then resume from the saved checkpoint
+with open('dump.json', 'rb') as file:
+    for count, (record, checkpoint) in enumerate(stream_items(file, 'records.item'), 1):
+        if count == 1000:
+            break
+with open('dump.json', 'rb') as file:
+    record, offset = next(stream_items(file, 'records.item', checkpoint=checkpoint))
+print(record)  # Output: {'name': 'Alice 1000', 'age': 10, 'city': 'Zürich'}
+```
+
+### **Summary:**
+
+- **`json.load()`** needs memory for the whole document; a **streaming parser** needs memory for one buffer and one record.
+- **Select** records with a path such as `records.item`, and **skip** everything else without building it.
+- **Save** the byte offset after each record as a checkpoint and **resume** from it with `stream_items(..., checkpoint=offset)`.
+
+======================================================================================
+
+TODO:Reading and writing JSON Lines files fast?
+
+### **Reading and Writing JSON Lines Files Fast:**
+
+**JSON Lines** (`.jsonl`) stores one JSON document per line, built with the `json.dumps` and `json.loads` functions shown in "Working with CSV and JSON files":
+
+```
+{"name": "Alice", "age": 30, "city": "New York"}
+{"name": "Bob", "age": 25, "city": "Los Angeles"}
+```
+
+Because every line is independent, a file can be appended to without rewriting it, and its lines can be decoded in parallel. Two things make it fast:
+
+- **Bulk writes:** Calling `file.write()` once per record means many small system calls. Collect serialized records into a batch and write the batch with a single call.
+- **Parallel decoding:** Read the file in batches of lines and decode the batches in a process pool.
+
+To size a pipeline, both sides count the **records per second** and **bytes per second** they handle.
+
+### **1. Throughput Counters:**
+
+**Example:**
+```python
+import time
+
+class Throughput:
+    def __init__(self):
+        self.records, self.bytes = 0, 0
+        self.start = time.perf_counter()
+
+    def add(self, records, size):
+        self.records += records
+        self.bytes += size
+
+    def rates(self):
+        seconds = max(time.perf_counter() - self.start, 1e-9)
+        return {'records/s': round(self.records / seconds), 'MB/s': round(self.bytes / seconds / 1e6, 1)}
+```
+
+### **2. Writing in Batches:**
+
+- Records are serialized as they arrive and written when the batch is full, when the writer is closed, or when `flush()` is called.
+- The file is opened in binary append mode (`'ab'`), so an existing file is extended instead of overwritten.
+
+**Example:**
+```python
+import json
+
+class JSONLinesWriter:
+    def __init__(self, path, batch_size=10_000):
+        self.file = open(path, 'ab')
+        self.batch, self.batch_size = [], batch_size
+        self.counter = Throughput()
+
+    def write(self, record):
+        self.batch.append(json.dumps(record, ensure_ascii=False))
+        if len(self.batch) >= self.batch_size:
+            self.flush()
+
+    def write_many(self, records):
+        for record in records:
+            self.write(record)
+
+    def flush(self):
+        if self.batch:
+            data = ('\n'.join(self.batch) + '\n').encode('utf-8')
+            self.file.write(data)  # One system call for the whole batch
+            self.counter.add(len(self.batch), len(data))
+            self.batch = []
+        self.file.flush()
+
+    def close(self):
+        self.flush()
+        self.file.close()
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, *exc_info):
+        self.close()
+```
+
+### **3. Decoding in Parallel:**
+
+- `file.readlines(hint)` reads whole lines until about `hint` bytes have been read, which gives batches of similar size.
+- Each batch is decoded in a worker process; only a few batches are in flight at a time, and the records are yielded in the original order.
+
+**Example:**
+```python
+import os
+from collections import deque
+from concurrent.futures import ProcessPoolExecutor
+
+def decode_lines(lines):
+    return [json.loads(line) for line in lines if line.strip()]
+
+def read_json_lines(path, workers=None, batch_bytes=1024 * 1024, counter=None):
+    workers = workers or os.cpu_count()
+    counter = counter if counter is not None else Throughput()
+    with open(path, 'rb') as file, ProcessPoolExecutor(max_workers=workers) as executor:
+        pending = deque()
+        while True:
+            lines = file.readlines(batch_bytes)
+            if lines:
+                pending.append((executor.submit(decode_lines, lines), sum(map(len, lines))))
+            if pending and (not lines or len(pending) > 2 * workers):
+                future, size = pending.popleft()
+                records = future.result()
+                counter.add(len(records), size)
+                yield from records
+            elif not lines:
+                return
+```
+
+### **4. Example:**
+
+```python
+if __name__ == '__main__':
+    if os.path.exists('people.jsonl'):
+        os.remove('people.jsonl')
+
+    slow = Throughput()
+    with open('people_slow.jsonl', 'w', encoding='utf-8') as file:
+        for i in range(300_000):
+            line = json.dumps({'name': 'Alice %d' % i, 'age': i % 90, 'city': 'New York'}) + '\n'
+            file.write(line)
+            file.flush()  # One write call per record
+            slow.add(1, len(line))
+    print('Record by record:', slow.rates())
+
+    with JSONLinesWriter('people.jsonl') as writer:
+        writer.write_many({'name': 'Alice %d' % i, 'age': i % 90, 'city': 'New York'} for i in range(300_000))
+    print('Batched writer:  ', writer.counter.rates())
+
+    counter = Throughput()
+    total_age = sum(record['age'] for record in read_json_lines('people.jsonl', counter=counter))
+    print('Parallel reader: ', counter.rates(), 'total age', total_age)
+```
+
+### **Summary:**
+
+- **JSON Lines** keeps one record per line, so files can be appended to and decoded in parallel.
+- **Write** serialized records in large batches with one `write()` call per batch.
+- **Read** batches of lines with `readlines(hint)` and decode them in a process pool, keeping the original order.
+- **Count** records and bytes per second on both sides to size your pipelines.
+
+======================================================================================
+
+TODO:Encoding many records of the same shape to JSON quickly?
+
+### **Encoding Many Records of the Same Shape to JSON Quickly:**
+
+`json.dump(data, file, indent=4)` and `json.dumps(data)` work for any object, so for every record they look up the type of every value, escape every key and handle indentation again. When millions of records have the same shape (like `{'name', 'age', 'city'}`), most of that work is the same every time. A **schema-compiled encoder** does it once:
+
+- **Schema:** The field names and their types, in a fixed order, e.g. `{'name': str, 'age': int, 'city': str}`.
+- **Pre-escaped keys:** The keys and the punctuation are turned into a single format string once: `'{"name": %s, "age": %s, "city": %s}'`.
+- **Generated code:** A small function is generated for the schema and compiled with `exec()`. It fills the format string with the encoded values, using the C string escaper from the `json` module for strings.
+- **Hot mode:** No indentation. Indentation is for people reading the file; large exports should be compact.
+- **Safety:** If a record does not match the schema (missing key, extra key, keys in another order, other type, `NaN`), the encoder falls back to `json.dumps()`, so the output is always the same as `json.dumps(record)`. Schemas with keys that are not strings (`{1: 'a'}`) are not compiled at all and use `json.dumps()` directly. `checked=False` skips these checks for data that is known to match the schema.
+
+### **1. Compiling an Encoder:**
+
+**Example:**
+```python
+import json
+from json.encoder import encode_basestring_ascii
+
+ENCODERS = {
+    str: '_string(%s)',
+    int: 'int.__repr__(%s)',
+    float: 'float.__repr__(%s)',
+    bool: "('true' if %s else 'false')",
+}
+
+def compile_encoder(schema, checked=True):
+    if not all(type(field) is str for field in schema):
+        return json.dumps  # json turns keys like 1, True or None into strings in its own way
+    template = '{' + ', '.join(json.dumps(field).replace('%', '%%') + ': %s' for field in schema) + '}'
+    lines = ['def encode(record):',
+             '    if tuple(record) != _fields:' if checked else '    if len(record) != %d:' % len(schema),
+             '        return _dumps(record)',  # Other keys, or the same keys in another order
+             '    try:']
+    checks, values = [], []
+    for number, (field, kind) in enumerate(schema.items()):
+        variable = 'v%d' % number
+        lines.append('        %s = record[%r]' % (variable, field))
+        checks.append('type(%s) is not _type%d' % (variable, number))
+        if kind is float:
+            checks.append('not -_infinity < %s < _infinity' % variable)  # NaN and infinity
+        values.append(ENCODERS.get(kind, '_dumps(%s)') % variable)
+    lines += ['    except KeyError:',
+              '        return _dumps(record)']
+    if checked:
+        lines += ['    if %s:' % ' or '.join(checks),
+                  '        return _dumps(record)']
+    lines.append('    return %r %% (%s,)' % (template, ', '.join(values)))
+
+    namespace = {'_string': encode_basestring_ascii, '_dumps': json.dumps, '_infinity': float('inf'),
+                 '_fields': tuple(schema)}
+    namespace.update(('_type%d' % number, kind) for number, kind in enumerate(schema.values()))
+    exec('\n'.join(lines), namespace)
+    return namespace['encode']
+
+encode = compile_encoder({'name': str, 'age': int, 'city': str})
+print(encode({'name': 'Alice', 'age': 30, 'city': 'New York'}))
+# Output: {"name": "Alice", "age": 30, "city": "New York"}
+```
+
+### **2. Reusing Compiled Encoders:**
+
+- Compiling takes some time, so each encoder is compiled once per schema and kept in a dictionary.
+
+**Example:**
+```python
+_encoders = {}
+
+def encoder_for(record):
+    schema = {field: type(value) for field, value in record.items()}
+    key = tuple(schema.items())
+    if key not in _encoders:
+        _encoders[key] = compile_encoder(schema)
+    return _encoders[key]
+
+def write_records(records, file):
+    records = iter(records)
+    first = next(records, None)
+    if first is None:
+        return
+    encode = encoder_for(first)
+    file.write(encode(first) + '\n')
+    file.writelines(encode(record) + '\n' for record in records)
+```
+
+### **3. Benchmark:**
+
+**Example:**
+```python
+import time
+
+records = [{'name': 'Alice %d' % i, 'age': i % 90, 'city': 'Zürich' if i % 3 else 'New York'}
+           for i in range(1_000_000)]
+encode = encoder_for(records[0])
+fast = compile_encoder({'name': str, 'age': int, 'city': str}, checked=False)
+
+for label, function in [('json.dumps', json.dumps), ('compiled', encode), ('compiled, unchecked', fast)]:
+    start = time.perf_counter()
+    lines = [function(record) for record in records]
+    print('%-20s %.2f s' % (label, time.perf_counter() - start))
+
+print(all(encode(record) == json.dumps(record) for record in records[:1000]))  # Output: True
+print(encode({'name': 'Bob', 'age': 25.5, 'city': None}))  # Other types fall back to json.dumps
+# Output: {"name": "Bob", "age": 25.5, "city": null}
+print(encoder_for({1: 'a', 'b': 2})({1: 'a', 'b': 2}))  # Output: {"1": "a", "b": 2}
+```
+
+### **Summary:**
+
+- **Compile** one encoding function per record shape with pre-escaped keys and a fixed field order, and **reuse** it for every record.
+- **Encode** strings with the C escaper `json.encoder.encode_basestring_ascii`, and skip indentation for large exports.
+- **Fall back** to `json.dumps()` for records that do not match the schema, so the output never changes.
+
+======================================================================================
+
+TODO:Jumping to line N of a huge text file (line offset index)?
+
+### **Jumping to Line N of a Huge Text File:**
+
+`readlines()`, `readline()`, `seek()` and `tell()` from "File modes and file objects" are enough to read a file from the start, but getting line 50,000,000 of a 20 GB log means reading every line before it. `seek()` can jump to any **byte** position instantly, so the trick is to remember at which byte each line starts.
+
+- **Line offset index:** A list of byte offsets where lines start. Storing one offset per line costs 8 bytes per line, so the index keeps only **every k-th line** (a **sparse** index). To find line `n`, seek to the offset of line `n // k * k` and skip at most `k - 1` lines.
+- **Compact storage:** The offsets are stored in an `array('q')` (8-byte integers) instead of a list of Python `int` objects, and saved as a **sidecar file** (`big.log.idx`) with `array.tofile()`.
+- **Building with `mmap`:** `mmap.find(b'\n', position)` searches for newlines in C without creating a Python string per line.
+- **Appends:** Log files grow. The index remembers how many bytes and lines it covers, so after an append only the new part is scanned.
+- **Rotation:** Logs are also rotated or rewritten, and the new file can already be larger than the indexed part of the old one. The sidecar file stores the file's inode and device number and a CRC32 of its first 4 KB and its last indexed byte; if any of them changed, the index is rebuilt.
+
+### **1. The Line Index:**
+
+**Example:**
+```python
+import mmap
+import os
+import zlib
+from array import array
+
+class LineIndex:
+    def __init__(self, path, every=1000):
+        self.path, self.index_path = path, path + '.idx'
+        self.every = every
+        self.offsets = array('q')  # Byte offset of lines 0, every, 2 * every, ...
+        self.lines, self.size = 0, 0  # How much of the file is indexed
+        self.load()
+        self.update()
+
+    def load(self):
+        if not os.path.exists(self.index_path):
+            return
+        with open(self.index_path, 'rb') as file:
+            header = array('Q')  # every, lines, size, inode, device, checksum
+            header.fromfile(file, 6)
+            count = (os.path.getsize(self.index_path) - 6 * header.itemsize) // header.itemsize
+            self.offsets.fromfile(file, count)
+        every, self.lines, self.size, inode, device, checksum = header
+        stat = os.stat(self.path)
+        if (every != self.every or self.size > stat.st_size  # Other settings, or the file got shorter
+                or (inode, device) != (stat.st_ino, stat.st_dev)  # Rotated: a new file under the same name
+                or checksum != self.checksum(self.size)):  # Rewritten in place
+            self.offsets, self.lines, self.size = array('q'), 0, 0
+
+    def checksum(self, size):  # CRC32 of the first 4 KB and of the last indexed byte (a newline)
+        with open(self.path, 'rb') as file:
+            crc = zlib.crc32(file.read(min(size, 4096)))
+            file.seek(max(size - 1, 0))
+            return zlib.crc32(file.read(1) if size else b'', crc)
+
+    def save(self):
+        stat = os.stat(self.path)
+        with open(self.index_path + '.tmp', 'wb') as file:
+            array('Q', [self.every, self.lines, self.size, stat.st_ino, stat.st_dev,
+                        self.checksum(self.size)]).tofile(file)
+            self.offsets.tofile(file)
+        os.replace(self.index_path + '.tmp', self.index_path)
+
+    def update(self):
+        size = os.path.getsize(self.path)
+        if size == self.size:
+            return
+        with open(self.path, 'rb') as file, mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) as data:
+            position, lines, every, offsets = self.size, self.lines, self.every, self.offsets
+            while position < size:
+                newline = data.find(b'\n', position)
+                if newline == -1:  # Unfinished last line: indexed after the next append
+                    break
+                if lines % every == 0:
+                    offsets.append(position)
+                position, lines = newline + 1, lines + 1
+        self.lines, self.size = lines, position
+        self.save()
+
+    def __len__(self):
+        return self.lines
+
+    def get_lines(self, start, stop):
+        stop = min(stop, self.lines)
+        if not 0 <= start < stop:
+            return []
+        with open(self.path, 'rb') as file:
+            file.seek(self.offsets[start // self.every])
+            for _ in range(start % self.every):
+                file.readline()  # Skip at most every - 1 lines
+            return [file.readline().decode('utf-8').rstrip('\n') for _ in range(stop - start)]
+
+    def get_line(self, number):
+        lines = self.get_lines(number, number + 1)
+        if not lines:
+            raise IndexError('line %d out of range' % number)
+        return lines[0]
+```
+
+### **2. Example:**
+
+```python
+import time
+
+with open('big.log', 'w') as file:
+    file.writelines('2024-08-27 12:00:%02d INFO request %d handled\n' % (i % 60, i) for i in range(2_000_000))
+
+start = time.perf_counter()
+index = LineIndex('big.log', every=1000)
+print('Indexed %d lines in %.2f s' % (len(index), time.perf_counter() - start))
+print('Index size: %d bytes' % os.path.getsize('big.log.idx'))
+
+start = time.perf_counter()
+print(index.get_line(1_234_567))  # Output: 2024-08-27 12:00:07 INFO request 1234567 handled
+print(index.get_lines(10, 12))
+print('Lookup: %.2f ms' % ((time.perf_counter() - start) * 1000))
+
+with open('big.log', 'a') as file:
+    file.write('2024-08-27 12:01:00 INFO appended line\n')
+start = time.perf_counter()
+index = LineIndex('big.log', every=1000)  # Loads the sidecar file and scans only the new bytes
+print(len(index), index.get_line(len(index) - 1), '%.2f ms' % ((time.perf_counter() - start) * 1000))
+
+os.replace('big.log', 'big.log.1')  # Rotated: a new, larger file under the old name
+with open('big.log', 'w') as file:
+    file.writelines('%d\n' % i for i in range(3_000_000))
+index = LineIndex('big.log', every=1000)  # The old index no longer matches and is rebuilt
+print(len(index), index.get_line(50))  # Output: 3000000 50
+```
+
+- The index for 2,000,000 lines is about 16 KB with `every=1000`, and every lookup needs one `seek()` and at most 999 `readline()` calls, no matter how large the file is.
+- A smaller `every` makes lookups faster and the index larger; `every=1` stores the start of every line.
+
+### **Summary:**
+
+- **Index** the byte offset of every k-th line with `mmap.find()`, and keep the offsets in a compact `array('q')`.
+- **Save** the index as a sidecar file, and scan only the appended bytes when the file grows.
+- **Read** line `n` with one `seek()` to the nearest indexed line and a few `readline()` calls.
+
+======================================================================================
+
+TODO:Reading binary records without copying (memoryview and struct)?
+
+### **Reading Binary Records Without Copying:**
+
+"Reading and writing binary files" reads bytes with `file.read(10)`. Every `read()` and every slice of a `bytes` object **copies** the data into a new object. Files of fixed-width records (e.g. a 4-byte id, an 8-byte score and an 8-byte name per record) can be read much faster by avoiding those copies:
+
+- **`mmap`:** Maps the file into memory; the operating system loads pages only when they are used.
+- **`memoryview`:** A view on the mapped bytes. Slicing a `memoryview` does **not** copy anything.
+- **`struct.Struct`:** A precompiled record format (e.g. `'<id8s'`). `unpack_from(buffer, offset)` decodes a record straight from the view, and `iter_unpack()` decodes all records in C.
+- **Lazy fields:** One `struct.Struct` per field decodes a single field at its offset, without decoding the rest of the record.
+- **Columns:** A numeric field of all records can be copied into an `array` using **strided** `memoryview` slices (every n-th byte), without creating any intermediate `bytes` objects.
+
+### **1. Format Characters:**
+
+- `'<'` means little-endian with standard sizes and no padding, so the layout is the same on every machine.
+- `'i'`: 4-byte integer, `'q'`: 8-byte integer, `'d'`: 8-byte float, `'8s'`: 8 raw bytes.
+
+```python
+import struct
+
+record = struct.Struct('<id8s')
+print(record.size)  # Output: 20
+data = record.pack(1, 9.5, b'Alice')
+print(record.unpack(data))  # Output: (1, 9.5, b'Alice\x00\x00\x00')
+```
+
+### **2. The Record Reader:**
+
+**Example:**
+```python
+import mmap
+import sys
+from array import array
+
+BYTE_ORDERS = {'<': 'little', '>': 'big', '!': 'big', '=': sys.byteorder}
+
+class RecordFile:
+    def __init__(self, path, fields, byte_order='<'):
+        if byte_order not in BYTE_ORDERS:  # '@' would add native padding and break the field offsets
+            raise ValueError('byte_order must be one of %s, not %r'
+                             % (', '.join(map(repr, BYTE_ORDERS)), byte_order))
+        self.byte_order = byte_order
+        self.record = struct.Struct(byte_order + ''.join(code for name, code in fields))
+        self.fields, offset = {}, 0
+        for name, code in fields:
+            field = struct.Struct(byte_order + code)
+            self.fields[name] = (field, offset, code)
+            offset += field.size
+        with open(path, 'rb') as file:
+            self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+        self.view = memoryview(self.map)
+        self.count = len(self.map) // self.record.size
+
+    def __len__(self):
+        return self.count
+
+    def __getitem__(self, number):
+        return self.record.unpack_from(self.view, number * self.record.size)
+
+    def __iter__(self):
+        return self.record.iter_unpack(self.view[:self.count * self.record.size])
+
+    def raw(self, number):
+        start = number * self.record.size
+        return self.view[start:start + self.record.size]  # A view, not a copy
+
+    def get(self, number, name):
+        field, offset, code = self.fields[name]
+        return field.unpack_from(self.view, number * self.record.size + offset)[0]
+
+    def column(self, name):
+        field, offset, code = self.fields[name]
+        column = array(code, [0]) * self.count
+        if column.itemsize != field.size:
+            raise TypeError('field %r cannot be stored in an array' % name)
+        target, size, end = memoryview(column).cast('B'), self.record.size, self.count * self.record.size
+        for byte in range(field.size):
+            target[byte::field.size] = self.view[offset + byte:end:size]  # Byte number `byte` of every value
+        target.release()
+        if BYTE_ORDERS[self.byte_order] != sys.byteorder:
+            column.byteswap()
+        return column
+
+    def close(self):
+        self.view.release()
+        self.map.close()
+```
+
+- `byte_order` is `'<'` (little-endian), `'>'` or `'!'` (big-endian) or `'='` (the order of this machine). `'@'` is rejected, because it adds padding between fields like a C compiler does, and the field offsets would no longer add up.
+- Views returned by `raw()` must be released (`view.release()`) before `close()`, because a mapped file cannot be closed while views on it exist.
+
+### **3. Example:**
+
+```python
+import time
+
+fields = [('id', 'i'), ('score', 'd'), ('name', '8s')]
+record = struct.Struct('<id8s')
+with open('records.bin', 'wb') as file:
+    file.write(b''.join(record.pack(i, i * 0.5, b'user%d' % (i % 1000)) for i in range(1_000_000)))
+
+start = time.perf_counter()
+total = 0.0
+with open('records.bin', 'rb') as file:
+    while chunk := file.read(record.size):  # One new bytes object per record
+        total += record.unpack(chunk)[1]
+print('read() + unpack:   %.3f s' % (time.perf_counter() - start), total)
+
+records = RecordFile('records.bin', fields)
+
+start = time.perf_counter()
+total = sum(score for id, score, name in records)
+print('iter_unpack:       %.3f s' % (time.perf_counter() - start), total)
+
+start = time.perf_counter()
+scores = records.column('score')
+print('column (array):    %.3f s' % (time.perf_counter() - start), sum(scores))
+
+print(records.get(123_456, 'name'))  # Output: b'user456\x00'
+print(records.column('id')[:5])  # Output: array('i', [0, 1, 2, 3, 4])
+records.close()
+```
+
+### **Summary:**
+
+- **Map** the file with `mmap` and wrap it in a `memoryview`; slices of the view do not copy.
+- **Decode** records with a precompiled `struct.Struct` using `unpack_from()` and `iter_unpack()`, and single fields with one `Struct` per field.
+- **Extract** numeric columns into `array` objects with strided `memoryview` copies, without intermediate `bytes`.
+
+======================================================================================
+
+TODO:Append-only logs with checksums, an index and group commit?
+
+### **Append-Only Logs:**
+
+The `'ab'` example in "Reading and writing binary files" appends each record with its own `write()` call. That is fine for a few records, but a program that must not lose data (a job queue, an audit trail, an event store) needs more:
+
+- **Record format:** Each record is written as `length | CRC | payload`. The length tells where the record ends; the **CRC** (`zlib.crc32`) detects records that were only partly written during a crash or damaged later.
+- **Index:** A side file with the byte offset of every record, so record number `n` can be read with one `seek()`.
+- **Durability:** `file.write()` only hands data to the operating system. `os.fsync()` forces it onto the disk, but takes from microseconds to milliseconds.
+- **Group commit:** Instead of one `fsync()` per record, records are collected and written and synced together, every **N records** or every **N milliseconds**. One `fsync()` then protects many records.
+- **Segments:** The log is split into files (**segments**) of limited size. Old segments can be archived or deleted without touching the one being written.
+
+### **1. The Segment Log:**
+
+- Segment files are named after the number of their first record (`00000000000000000000.log`), with a matching `.idx` file of 8-byte offsets.
+- On opening, the newest segment is scanned and checked: a torn record at the end (from a crash) is cut off, and its index is rebuilt. The index of a full segment is synced to the disk before the log rolls over, because it is never rebuilt.
+- `durability` is `'always'` (`fsync()` after every record), `'batch'` (group commit) or `'none'` (leave it to the operating system).
+- A background thread commits the pending records once `batch_ms` have passed, even when no further record is appended. A lock keeps it from committing while `append()` adds to the batch, which also makes `append()` safe to call from several threads.
+
+**Example:**
+```python
+import bisect
+import os
+import struct
+import threading
+import time
+import zlib
+from array import array
+
+HEADER = struct.Struct('<II')  # Payload length, CRC32 of the payload
+
+class AppendLog:
+    def __init__(self, directory, segment_bytes=64 * 1024 * 1024, durability='batch',
+                 batch_records=1000, batch_ms=10):
+        os.makedirs(directory, exist_ok=True)
+        self.directory, self.segment_bytes, self.durability = directory, segment_bytes, durability
+        self.batch_records = 1 if durability == 'always' else batch_records
+        self.batch_seconds = batch_ms / 1000
+        self.bases = sorted(int(name[:-4]) for name in os.listdir(directory) if name.endswith('.log'))
+        self.pending, self.pending_offsets, self.last_commit = bytearray(), array('q'), time.monotonic()
+        self.lock = threading.RLock()
+        self.open_segment(self.bases[-1] if self.bases else 0)
+        self.stopped = threading.Event()
+        self.flusher = threading.Thread(target=self.flush_periodically, daemon=True)
+        if self.batch_records > 1:
+            self.flusher.start()
+
+    def flush_periodically(self):  # Runs in the background thread
+        timeout = self.batch_seconds
+        while not self.stopped.wait(timeout):
+            with self.lock:
+                timeout = self.last_commit + self.batch_seconds - time.monotonic()
+                if timeout <= 0:  # No commit for batch_ms: commit what is pending
+                    self.commit()
+                    timeout = self.batch_seconds
+
+    def path(self, base, extension):
+        return os.path.join(self.directory, '%020d%s' % (base, extension))
+
+    def scan(self, file, offset=0):
+        file.seek(offset)
+        while True:
+            header = file.read(HEADER.size)
+            if len(header) < HEADER.size:
+                return
+            length, crc = HEADER.unpack(header)
+            payload = file.read(length)
+            if len(payload) < length or zlib.crc32(payload) != crc:
+                return  # Torn or damaged record: the valid log ends here
+            yield offset, payload
+            offset += HEADER.size + length
+
+    def open_segment(self, base):
+        if base not in self.bases:
+            self.bases.append(base)
+        self.base, self.offsets = base, array('q')
+        self.file = open(self.path(base, '.log'), 'a+b')
+        for offset, payload in self.scan(self.file):
+            self.offsets.append(offset)
+        end = self.offsets[-1] + HEADER.size + len(payload) if self.offsets else 0
+        self.file.truncate(end)  # Cut off a torn record after a crash
+        self.file.seek(end)
+        self.size = end
+        with open(self.path(base, '.idx'), 'wb') as index:
+            self.offsets.tofile(index)
+        self.index = open(self.path(base, '.idx'), 'ab')
+
+    def __len__(self):
+        return self.base + len(self.offsets) + len(self.pending_offsets)
+
+    def append(self, payload):
+        with self.lock:
+            number = len(self)
+            self.pending_offsets.append(self.size + len(self.pending))
+            self.pending += HEADER.pack(len(payload), zlib.crc32(payload)) + payload
+            if (len(self.pending_offsets) >= self.batch_records
+                    or time.monotonic() - self.last_commit >= self.batch_seconds):
+                self.commit()
+            return number
+
+    def commit(self):
+        with self.lock:
+            if self.pending:
+                self.file.write(self.pending)  # One write for the whole group
+                self.file.flush()
+                if self.durability != 'none':
+                    os.fsync(self.file.fileno())  # One fsync for the whole group
+                self.pending_offsets.tofile(self.index)
+                self.index.flush()
+                self.offsets.extend(self.pending_offsets)
+                self.size += len(self.pending)
+                self.pending, self.pending_offsets = bytearray(), array('q')
+            self.last_commit = time.monotonic()
+            if self.size >= self.segment_bytes:
+                if self.durability != 'none':
+                    os.fsync(self.index.fileno())  # Only the newest index is rebuilt on opening
+                self.file.close()
+                self.index.close()
+                self.open_segment(self.base + len(self.offsets))  # Roll over to a new segment
+
+    def read(self, number):
+        with self.lock:
+            if number >= self.base + len(self.offsets):
+                self.commit()
+            segment = self.bases[bisect.bisect_right(self.bases, number) - 1]
+            offset = self.offsets[number - segment] if segment == self.base else None
+        if offset is None:
+            offsets = array('q')
+            with open(self.path(segment, '.idx'), 'rb') as index:
+                offsets.frombytes(index.read())
+            offset = offsets[number - segment]
+        with open(self.path(segment, '.log'), 'rb') as file:
+            for offset, payload in self.scan(file, offset):
+                return payload
+        raise ValueError('record %d is damaged' % number)
+
+    def close(self):
+        self.stopped.set()
+        if self.flusher.is_alive():
+            self.flusher.join()
+        self.commit()
+        self.file.close()
+        self.index.close()
+```
+
+### **2. Example:**
+
+```python
+import shutil
+
+log = AppendLog('events', segment_bytes=1024 * 1024)
+for i in range(50_000):
+    log.append(b'{"event": "click", "user": %d}' % i)
+print(log.read(12_345))  # Output: b'{"event": "click", "user": 12345}'
+print(len(log), 'records in', len(log.bases), 'segments')
+log.close()
+
+with open(log.path(log.base, '.log'), 'ab') as file:
+    file.write(HEADER.pack(100, 0) + b'torn')  # Simulate a crash in the middle of a write
+log = AppendLog('events', segment_bytes=1024 * 1024)
+print(len(log))  # Output: 50000
+log.append(b'{"event": "logout", "user": 7}')
+time.sleep(0.1)  # No further appends: the background thread commits the batch after batch_ms
+print(len(log.pending_offsets), os.path.getsize(log.path(log.base, '.log')) == log.size)  # Output: 0 True
+log.close()
+shutil.rmtree('events')
+```
+
+### **3. Benchmark of Durability Levels:**
+
+```python
+def benchmark(durability, count, **options):
+    log = AppendLog('bench_log', durability=durability, **options)
+    payload = b'x' * 100
+    start = time.perf_counter()
+    for _ in range(count):
+        log.append(payload)
+    log.close()
+    seconds = time.perf_counter() - start
+    shutil.rmtree('bench_log')
+    print('%-40s %10.0f appends/s' % ('%s %s' % (durability, options or ''), count / seconds))
+
+benchmark('none', 200_000)
+benchmark('batch', 200_000, batch_records=1000, batch_ms=10)
+benchmark('batch', 50_000, batch_records=100, batch_ms=1)
+benchmark('always', 2_000)
+```
+
+- `'always'` is limited by the speed of `fsync()` on your disk; `'batch'` pays for one `fsync()` per group and gets close to the speed of `'none'` while never losing more than one batch.
+
+### **Summary:**
+
+- **Frame** every record with its length and a CRC, so torn and damaged records are detected and cut off on recovery.
+- **Index** record offsets in a side file for direct access with `seek()`.
+- **Group commit:** write and `fsync()` many records at once, every N records or N milliseconds.
+- **Roll over** to a new segment file when the current one is full.
+
+======================================================================================
+
+TODO:Copying, moving and deleting large directory trees in parallel?
+
+### **Copying, Moving and Deleting Large Directory Trees in Parallel:**
+
+`shutil.copytree`, `shutil.move` and `shutil.rmtree` from "File system operations" handle one file at a time. For a tree of thousands of files, most of the time is spent waiting for the disk (or the network, on NFS) to answer one request before the next one is sent. Working on many files at once keeps the storage busy:
+
+- **`os.scandir`:** Lists a directory and returns `DirEntry` objects that already know whether each entry is a file, a directory or a link, so no extra `os.stat()` call is needed per file.
+- **Thread pool:** File copies and deletes are handed to a `ThreadPoolExecutor`. Threads are a good fit because file I/O releases the GIL. Only a limited number of operations are **in flight** at a time, so a huge tree does not create millions of pending tasks.
+- **Fast paths:**
+  - **`os.rename`:** Moving inside the same file system only changes a directory entry, no matter how large the tree is.
+  - **`os.copy_file_range` / `os.sendfile`:** Copy data inside the kernel, without moving it through Python `bytes` objects (Linux).
+- **Progress:** Files and bytes done, and the throughput in MB/s.
+
+### **1. Walking a Tree with `os.scandir`:**
+
+**Example:**
+```python
+import os
+
+def walk(root):  # Like os.walk, but yields DirEntry objects: (directory, subdirectories, files, links)
+    stack = [root]
+    while stack:
+        directory = stack.pop()
+        subdirectories, files, links = [], [], []
+        with os.scandir(directory) as entries:
+            for entry in entries:
+                if entry.is_symlink():
+                    links.append(entry)
+                elif entry.is_dir():
+                    subdirectories.append(entry)
+                else:
+                    files.append(entry)
+        yield directory, subdirectories, files, links
+        stack.extend(entry.path for entry in subdirectories)
+```
+
+### **2. Progress and Bounded Parallelism:**
+
+**Example:**
+```python
+import threading
+import time
+from collections import deque
+
+class Progress:
+    def __init__(self, label, interval=1.0):
+        self.label, self.interval = label, interval
+        self.files, self.bytes = 0, 0
+        self.lock = threading.Lock()
+        self.start = self.last_report = time.perf_counter()
+
+    def add(self, files, size=0):
+        with self.lock:
+            self.files += files
+            self.bytes += size
+            if time.perf_counter() - self.last_report >= self.interval:
+                self.report()
+
+    def report(self):
+        self.last_report = time.perf_counter()
+        seconds = max(self.last_report - self.start, 1e-9)
+        print('%s: %d files, %.1f MB, %.1f MB/s, %.0f files/s' % (
+            self.label, self.files, self.bytes / 1e6, self.bytes / 1e6 / seconds, self.files / seconds))
+
+def run_bounded(executor, function, items, limit):  # At most `limit` calls in flight
+    in_flight = deque()
+    for item in items:
+        if len(in_flight) >= limit:
+            in_flight.popleft().result()  # Also raises errors from the workers
+        in_flight.append(executor.submit(function, item))
+    for future in in_flight:
+        future.result()
+```
+
+### **3. Copying Files in the Kernel:**
+
+- `os.copy_file_range` (Linux, Python 3.8+) can even share the data blocks on file systems like Btrfs or XFS. If it is not supported (other operating system or file system), `os.sendfile`, and finally `shutil.copyfileobj`, are used.
+
+**Example:**
+```python
+import shutil
+
+def copy_file(source, target, size):
+    with open(source, 'rb') as reader, open(target, 'wb') as writer:
+        copied = 0
+        for copy in (getattr(os, 'copy_file_range', None), getattr(os, 'sendfile', None)):
+            if copy is None:
+                continue
+            try:
+                os.lseek(writer.fileno(), copied, os.SEEK_SET)  # sendfile() writes at the file position
+                while copied < size:
+                    if copy is os.sendfile:
+                        done = copy(writer.fileno(), reader.fileno(), copied, size - copied)
+                    else:
+                        done = copy(reader.fileno(), writer.fileno(), size - copied, copied, copied)
+                    if done == 0:
+                        break  # The file got shorter while copying
+                    copied += done
+                break
+            except OSError:
+                continue  # Not supported here: try the next method from `copied` on
+        else:
+            reader.seek(copied)
+            writer.seek(copied)
+            shutil.copyfileobj(reader, writer, 1024 * 1024)
+    shutil.copystat(source, target)
+```
+
+### **4. Copy, Move and Delete:**
+
+- Directories are created by the main thread while walking, so a directory always exists before its files are copied into it.
+- When deleting, all files are removed first; the directories are removed afterwards, deepest first.
+
+**Example:**
+```python
+import errno
+from concurrent.futures import ThreadPoolExecutor
+
+def copy_tree(source, target, workers=16, progress=None):
+    progress = progress or Progress('copy')
+
+    def tasks():
+        for directory, subdirectories, files, links in walk(source):
+            destination = os.path.join(target, os.path.relpath(directory, source))
+            os.makedirs(destination, exist_ok=True)
+            for entry in links:
+                os.symlink(os.readlink(entry.path), os.path.join(destination, entry.name))
+            for entry in files:
+                yield entry.path, os.path.join(destination, entry.name), entry.stat().st_size
+
+    def copy(task):
+        copy_file(*task)
+        progress.add(1, task[2])
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        run_bounded(executor, copy, tasks(), limit=4 * workers)
+    progress.report()
+
+def delete_tree(root, workers=16, progress=None):
+    progress = progress or Progress('delete')
+    directories = []
+
+    def tasks():
+        for directory, subdirectories, files, links in walk(root):
+            directories.append(directory)
+            yield from (entry.path for entry in files + links)
+
+    def delete(path):
+        os.unlink(path)
+        progress.add(1)
+
+    with ThreadPoolExecutor(max_workers=workers) as executor:
+        run_bounded(executor, delete, tasks(), limit=4 * workers)
+    for directory in reversed(directories):  # Children were walked after their parents
+        os.rmdir(directory)
+    progress.report()
+
+def move_tree(source, target, workers=16):
+    try:
+        os.rename(source, target)  # Same file system: just a new directory entry
+    except OSError as error:
+        if error.errno != errno.EXDEV:  # EXDEV: source and target are on different file systems
+            raise
+        copy_tree(source, target, workers, Progress('move'))
+        delete_tree(source, workers)
+```
+
+### **5. Example:**
+
+```python
+for i in range(2000):
+    os.makedirs('tree/part%02d' % (i % 20), exist_ok=True)
+    with open('tree/part%02d/file%04d.txt' % (i % 20, i), 'wb') as file:
+        file.write(os.urandom(1024 * (i % 64 + 1)))
+os.symlink('part00', 'tree/latest')
+
+start = time.perf_counter()
+shutil.copytree('tree', 'tree_shutil', symlinks=True)
+print('shutil.copytree: %.2f s' % (time.perf_counter() - start))
+
+copy_tree('tree', 'tree_copy')
+print(sorted(os.listdir('tree_copy')) == sorted(os.listdir('tree')))  # Output: True
+
+move_tree('tree_copy', 'tree_moved')  # Same file system: instant
+print(os.path.exists('tree_copy'), os.path.islink('tree_moved/latest'))  # Output: False True
+
+start = time.perf_counter()
+shutil.rmtree('tree_shutil')
+print('shutil.rmtree:   %.2f s' % (time.perf_counter() - start))
+delete_tree('tree_moved')
+delete_tree('tree')
+```
+
+- On a local SSD the gain is moderate; on network file systems and cloud disks, where every request waits for a round trip, 16 or more parallel operations are often several times faster.
+
+### **Summary:**
+
+- **Walk** trees with `os.scandir`, which returns the entry type without extra `os.stat()` calls.
+- **Parallelize** copies and deletes with a thread pool, keeping a bounded number of operations in flight.
+- **Use fast paths:** `os.rename` within one file system, and `os.copy_file_range` or `os.sendfile` to copy inside the kernel.
+- **Report** files, bytes and MB/s while the operation runs.
+
+======================================================================================
+
+TODO:Writing large text files safely and fast (atomic buffered writer)?
+
+### **Writing Large Text Files Safely and Fast:**
+
+The `'w'` and `'a'` examples in "Writing to a file" call `file.write()` once per string. Two things can go wrong when a program exports a large file this way:
+
+- **Speed:** Every `write()` call goes through several layers (text encoding, the file buffer, the system call), so millions of small writes are slow.
+- **Partial files:** If the program crashes or is stopped halfway, the file is left half written, and the program that reads it next cannot tell.
+
+An **atomic buffered writer** fixes both:
+
+- **Large buffer:** Strings are collected in a list and written in one `write()` call when the buffer reaches a **flush threshold** (a number of bytes or a number of seconds).
+- **Temporary file:** Everything is written to a temporary file in the same directory.
+- **Atomic rename:** On a successful close, the temporary file is renamed to the final name with `os.replace()`. Readers see either the old file or the complete new file, never a partial one. On an error, the temporary file is deleted and the old file is untouched.
+- **`fsync`:** `os.fsync()` on the file makes sure the data is on the disk before the rename; `os.fsync()` on the **directory** makes sure the rename itself survives a power failure.
+- **Metrics:** The number of flushes and how long they took, to tune the thresholds.
+
+### **1. The Writer:**
+
+**Example:**
+```python
+import os
+import tempfile
+import time
+
+UMASK = os.umask(0o022)  # os.umask() sets a new umask and returns the old one...
+os.umask(UMASK)  # ...so set it back right away
+
+class AtomicWriter:
+    def __init__(self, path, encoding='utf-8', flush_bytes=4 * 1024 * 1024, flush_seconds=None,
+                 sync=True, sync_directory=False):
+        self.path, self.encoding = path, encoding
+        self.flush_bytes, self.flush_seconds = flush_bytes, flush_seconds
+        self.sync, self.sync_directory = sync, sync_directory
+        self.directory = os.path.dirname(os.path.abspath(path))
+        descriptor, self.temporary = tempfile.mkstemp(dir=self.directory, prefix='.' + os.path.basename(path))
+        self.file = os.fdopen(descriptor, 'wb', buffering=0)  # Unbuffered: the writer is the buffer
+        self.buffer, self.buffered = [], 0
+        self.last_flush = time.perf_counter()
+        self.finished = False  # Closed or aborted: both only work once
+        self.metrics = {'writes': 0, 'flushes': 0, 'bytes': 0, 'flush_seconds': [], 'close_seconds': 0.0}
+
+    def write(self, text):
+        self.buffer.append(text)
+        self.buffered += len(text)
+        self.metrics['writes'] += 1
+        if self.buffered >= self.flush_bytes or (
+                self.flush_seconds is not None and time.perf_counter() - self.last_flush >= self.flush_seconds):
+            self.flush()
+
+    def writelines(self, lines):
+        for line in lines:
+            self.write(line)
+
+    def flush(self):
+        start = time.perf_counter()
+        if self.buffer:
+            data = ''.join(self.buffer).encode(self.encoding)
+            view = memoryview(data)
+            while view:
+                view = view[self.file.write(view):]  # A raw write() may write only part of the data
+            self.metrics['bytes'] += len(data)
+            self.metrics['flushes'] += 1
+            self.metrics['flush_seconds'].append(time.perf_counter() - start)
+            self.buffer, self.buffered = [], 0
+        self.last_flush = time.perf_counter()
+
+    def mode(self):
+        try:
+            return os.stat(self.path).st_mode & 0o7777  # Keep the permissions of the file being replaced
+        except FileNotFoundError:
+            return 0o666 & ~UMASK  # Like a file created with open()
+
+    def close(self):
+        if self.finished:
+            return
+        start = time.perf_counter()
+        try:
+            self.flush()
+            if self.sync:
+                os.fsync(self.file.fileno())  # The data is on the disk...
+            self.file.close()
+            os.chmod(self.temporary, self.mode())
+            os.replace(self.temporary, self.path)  # ...before the new file becomes visible
+        except BaseException:
+            self.abort()  # E.g. the disk got full on the last flush
+            raise
+        self.finished = True
+        if self.sync_directory and hasattr(os, 'O_DIRECTORY'):
+            descriptor = os.open(self.directory, os.O_RDONLY | os.O_DIRECTORY)
+            try:
+                os.fsync(descriptor)  # The rename itself is on the disk
+            finally:
+                os.close(descriptor)
+        self.metrics['close_seconds'] = time.perf_counter() - start
+
+    def abort(self):
+        if self.finished:
+            return
+        self.finished = True
+        self.file.close()
+        try:
+            os.remove(self.temporary)
+        except FileNotFoundError:
+            pass
+
+    def __enter__(self):
+        return self
+
+    def __exit__(self, exc_type, exc_value, traceback):
+        if exc_type is None:
+            self.close()
+        else:
+            self.abort()  # Keep the old file, drop the partial new one
+
+    def summary(self):
+        latencies = sorted(self.metrics['flush_seconds']) or [0.0]
+        return {'writes': self.metrics['writes'], 'flushes': self.metrics['flushes'],
+                'MB': round(self.metrics['bytes'] / 1e6, 1),
+                'flush p50 ms': round(latencies[len(latencies) // 2] * 1000, 3),
+                'flush max ms': round(latencies[-1] * 1000, 3),
+                'close ms': round(self.metrics['close_seconds'] * 1000, 3)}
+```
+
+- `flush_bytes` counts characters, which is close enough to bytes for mostly ASCII text and avoids encoding every string twice.
+- On Windows, directories cannot be opened with `os.open()`, so `sync_directory` is skipped there.
+- `tempfile.mkstemp()` creates the file readable only by its owner, so `close()` gives it the permissions of the file it replaces (or the usual ones for a new file) before the rename.
+- `close()` and `abort()` only work once, so calling `writer.close()` inside the `with` block (e.g. to read `summary()`) is fine.
+
+### **2. Example:**
+
+```python
+lines = ['%d,Alice %d,%d,New York\n' % (i, i, i % 90) for i in range(1_000_000)]
+
+start = time.perf_counter()
+with open('export_plain.csv', 'w', encoding='utf-8') as file:
+    for line in lines:
+        file.write(line)
+        file.flush()  # What unbuffered, line-by-line exporters do
+print('One write per line: %.2f s' % (time.perf_counter() - start))
+
+start = time.perf_counter()
+with AtomicWriter('export.csv', sync_directory=True) as writer:
+    writer.writelines(lines)
+print('AtomicWriter:       %.2f s' % (time.perf_counter() - start))
+print(writer.summary())
+
+size = os.path.getsize('export.csv')
+try:
+    with AtomicWriter('export.csv') as writer:
+        writer.write('id,name,age,city\n')
+        raise RuntimeError('export failed halfway')
+except RuntimeError as error:
+    print(error)
+print(os.path.getsize('export.csv') == size)  # Output: True
+print([name for name in os.listdir('.') if name.startswith('.export.csv')])  # Output: []
+
+os.chmod('export.csv', 0o640)
+with AtomicWriter('export.csv') as writer:
+    writer.write('id,name,age,city\n')
+    writer.close()  # Published here; leaving the with block does nothing more
+    print(writer.summary()['flushes'])  # Output: 1
+print(oct(os.stat('export.csv').st_mode & 0o777))  # Output: 0o640
+```
+
+### **Summary:**
+
+- **Buffer** many strings and write them with one call when a byte or time threshold is reached.
+- **Write** to a temporary file and publish it with `os.replace()`, so readers never see a partial file; delete the temporary file on errors.
+- **Sync** the file before the rename, and the directory after it, when the data must survive a power failure.
+- **Measure** flushes and their latency to choose the thresholds.
+
+======================================================================================
+
+TODO:Reading and writing compressed files transparently (gzip, bz2, xz, zstd)?
+
+### **Reading and Writing Compressed Files Transparently:**
+
+Large CSV, JSON and text files are often stored compressed (`data.csv.gz`, `dump.json.xz`). Decompressing them to disk first writes and reads the whole file one more time. Python can decompress **while reading** instead:
+
+- **Modules:** `gzip.open`, `bz2.open` and `lzma.open` (for `.xz`) from the standard library, and `zstandard.open` from the optional `zstandard` package (`pip install zstandard`), return file objects like `open()` does.
+- **Magic bytes:** Every format starts with a fixed signature, so the format can be detected from the first bytes instead of trusting the file name:
+  - **gzip:** `1f 8b`
+  - **bz2:** `42 5a 68` (`BZh`)
+  - **xz:** `fd 37 7a 58 5a 00`
+  - **zstd:** `28 b5 2f fd`
+- **Background thread:** Decompressing takes CPU time. The functions in `zlib`, `bz2` and `lzma` release the GIL while they work, so a background thread can decompress the next chunk while the main thread parses the current one. With two chunks in a queue (**double buffering**), neither side waits for the other.
+- **`open()`-compatible:** The result is a normal binary or text file object, so `csv.reader`, `json.load` and the readers from the previous sections work on it unchanged.
+
+### **1. Detecting the Format:**
+
+**Example:**
+```python
+import bz2
+import gzip
+import io
+import lzma
+import os
+import queue
+import threading
+
+try:
+    import zstandard  # Optional: pip install zstandard
+except ImportError:
+    zstandard = None
+
+MAGIC = {b'\x1f\x8b': 'gzip', b'BZh': 'bz2', b'\xfd7zXZ\x00': 'xz', b'\x28\xb5\x2f\xfd': 'zstd'}
+EXTENSIONS = {'.gz': 'gzip', '.bz2': 'bz2', '.xz': 'xz', '.zst': 'zstd'}
+
+def detect_compression(path):
+    with open(path, 'rb') as file:
+        head = file.read(6)
+    for magic, compression in MAGIC.items():
+        if head.startswith(magic):
+            return compression
+    return None
+
+def opener(compression):
+    if compression == 'zstd':
+        if zstandard is None:
+            raise ImportError('zstd files need the zstandard package: pip install zstandard')
+        return zstandard.open
+    return {'gzip': gzip.open, 'bz2': bz2.open, 'xz': lzma.open}[compression]
+```
+
+### **2. Decompressing in a Background Thread:**
+
+- `ThreadedReader` is a raw binary stream (`io.RawIOBase`): it only has to implement `readinto()`, and `io.BufferedReader` and `io.TextIOWrapper` add `read()`, `readline()`, iteration and decoding on top of it.
+- The queue holds at most `buffers` chunks, so memory use stays at a few megabytes for any file size.
+- An error in the background thread (e.g. `EOFError` for a truncated `.gz` file) is raised by the next read, and again by every read after it.
+- A compressed stream can only be read forwards. `seek()` to a later position reads and discards the data in between, which is enough to resume from a checkpoint.
+
+**Example:**
+```python
+class ThreadedReader(io.RawIOBase):
+    def __init__(self, file, chunk_size=1024 * 1024, buffers=2):
+        self.file, self.chunk_size = file, chunk_size
+        self.chunks = queue.Queue(maxsize=buffers)
+        self.chunk, self.position, self.eof = memoryview(b''), 0, False
+        self.error = None  # Raised again on every later read: the background thread has stopped
+        self.stopped = threading.Event()
+        self.thread = threading.Thread(target=self.fill, daemon=True)
+        self.thread.start()
+
+    def fill(self):  # Runs in the background thread
+        try:
+            while not self.stopped.is_set():
+                chunk = self.file.read(self.chunk_size)
+                self.put(chunk)
+                if not chunk:
+                    return
+        except Exception as error:
+            self.put(error)  # Raised again in the reading thread
+
+    def put(self, item):
+        while not self.stopped.is_set():
+            try:
+                self.chunks.put(item, timeout=0.1)
+                return
+            except queue.Full:
+                pass
+
+    def readable(self):
+        return True
+
+    def readinto(self, buffer):
+        if self.error is not None:
+            raise self.error
+        if not self.chunk and not self.eof:
+            item = self.chunks.get()
+            if isinstance(item, Exception):
+                self.error = item
+                raise item
+            self.chunk, self.eof = memoryview(item), not item
+        size = min(len(buffer), len(self.chunk))
+        buffer[:size] = self.chunk[:size]
+        self.chunk = self.chunk[size:]
+        self.position += size
+        return size
+
+    def seekable(self):
+        return True
+
+    def tell(self):
+        return self.position
+
+    def seek(self, offset, whence=io.SEEK_SET):
+        if whence == io.SEEK_CUR:
+            offset += self.position
+        elif whence != io.SEEK_SET:
+            raise io.UnsupportedOperation('cannot seek from the end of a compressed stream')
+        if offset < self.position:
+            raise io.UnsupportedOperation('cannot seek backwards in a compressed stream')
+        skip = bytearray(min(offset - self.position, self.chunk_size))
+        while self.position < offset and self.readinto(memoryview(skip)[:offset - self.position]):
+            pass
+        return self.position
+
+    def close(self):
+        if not self.closed:
+            self.stopped.set()
+            self.thread.join()
+            self.file.close()
+        super().close()
+```
+
+### **3. One `open()` for Every Format:**
+
+- Readers detect the format from the magic bytes; writers choose it from the file extension. Files that are not compressed are opened with the normal `open()`.
+- `gzip.open` compresses with level 9 by default, which is slow; level 6 (or lower) makes much faster exports and files that are only slightly larger.
+
+**Example:**
+```python
+def open_compressed(path, mode='r', encoding='utf-8', newline=None, compression='auto', level=None,
+                    chunk_size=1024 * 1024, buffers=2):
+    reading = 'r' in mode
+    if compression == 'auto':
+        compression = detect_compression(path) if reading else EXTENSIONS.get(os.path.splitext(path)[1])
+    if compression is None:
+        if 'b' in mode:
+            return open(path, mode)
+        return open(path, mode, encoding=encoding, newline=newline)
+
+    binary_mode = mode.replace('t', '').replace('b', '') + 'b'
+    if reading:
+        file = io.BufferedReader(ThreadedReader(opener(compression)(path, 'rb'), chunk_size, buffers))
+    elif compression == 'zstd':
+        file = opener(compression)(path, binary_mode, cctx=zstandard.ZstdCompressor(level=level or 3))
+    else:
+        keyword = 'preset' if compression == 'xz' else 'compresslevel'
+        file = opener(compression)(path, binary_mode, **({keyword: level} if level is not None else {}))
+    if 'b' in mode:
+        return file
+    return io.TextIOWrapper(file, encoding=encoding, newline=newline)
+```
+
+### **4. Example:**
+
+- The CSV part uses `ProjectedReader` from "Reading only the CSV columns you need", and the JSON part uses `stream_items` from "Streaming very large JSON files".
+
+```python
+import csv
+import json
+import time
+from itertools import islice
+
+with open_compressed('people.csv.gz', 'w', newline='', level=6) as file:
+    writer = csv.writer(file)
+    writer.writerow(['Name', 'Age', 'City'])
+    writer.writerows(['Alice %d' % i, i % 90, 'New York'] for i in range(300_000))
+print(detect_compression('people.csv.gz'))  # Output: gzip
+
+start = time.perf_counter()
+with gzip.open('people.csv.gz', 'rt', newline='') as file:
+    total_age = sum(int(row[1]) for row in islice(csv.reader(file), 1, None))
+print('gzip.open:       %.2f s, total age %d' % (time.perf_counter() - start, total_age))
+
+start = time.perf_counter()
+with open_compressed('people.csv.gz', newline='') as file:
+    total_age = sum(int(row[1]) for row in islice(csv.reader(file), 1, None))
+print('open_compressed: %.2f s, total age %d' % (time.perf_counter() - start, total_age))
+
+with open_compressed('people.csv.gz', newline='') as file:
+    columns = ProjectedReader(file, ['Age']).to_columns()
+print(sum(columns['Age']) == total_age)  # Output: True
+
+with open_compressed('dump.json.xz', 'w') as file:
+    json.dump({'records': [{'name': 'Alice %d' % i, 'age': i % 90} for i in range(100_000)]}, file)
+os.replace('dump.json.xz', 'dump_without_extension')  # Detected from the content, not the name
+
+with open_compressed('dump_without_extension', 'rb') as file:
+    for count, (record, checkpoint) in enumerate(stream_items(file, 'records.item'), 1):
+        if count == 1000:
+            break
+with open_compressed('dump_without_extension', 'rb') as file:
+    record, offset = next(stream_items(file, 'records.item', checkpoint=checkpoint))
+print(record)  # Output: {'name': 'Alice 1000', 'age': 10}
+
+if zstandard is not None:
+    with open_compressed('people.csv.zst', 'w', newline='') as file:
+        csv.writer(file).writerows([['Alice', 30, 'New York']])
+    with open_compressed('people.csv.zst', newline='') as file:
+        print(next(csv.reader(file)))  # Output: ['Alice', '30', 'New York']
+```
+
+- On a machine with several cores, the background thread decompresses while the main thread parses, so the total time gets close to the larger of the two instead of their sum.
+- Compressed files cannot be split into byte ranges, so `read_csv_parallel` from "Reading large CSV files in parallel" needs uncompressed files (or one compressed file per part).
+
+### **Summary:**
+
+- **Detect** the compression format from the magic bytes at the start of the file.
+- **Decompress** in a background thread with a small queue of chunks (double buffering), so decompression and parsing overlap.
+- **Wrap** the stream in `io.BufferedReader` and `io.TextIOWrapper`, so every reader that accepts a file object works with compressed files unchanged.
+- **Choose** the compression level for writers; the gzip default of 9 is rarely worth its cost.
+
+======================================================================================
+
+TODO:Reading and writing files from asyncio code (async file I/O)?
+
+### **Reading and Writing Files from `asyncio` Code:**
+
+Chapter 9 ("Asynchronous I/O") shows coroutines like `fetch_data()` that `await` slow operations, so the event loop can run other coroutines meanwhile. `with open(...)` and `file.read()` are **not** awaitable: while a coroutine reads a file, the whole event loop stops, and every other coroutine (network requests, timers, other files) waits, too.
+
+Operating systems offer no portable asynchronous API for regular files, so async libraries do what this section does: run the blocking calls in a **thread pool** and `await` the result.
+
+- **`loop.run_in_executor(executor, function, *args)`:** Runs `function(*args)` in a thread and returns an awaitable future. The event loop keeps running in the meantime.
+- **Bounded pool:** A fixed number of I/O threads (e.g. 32), and a limit on the number of files open at the same time (an `asyncio.Semaphore`), so starting 10,000 coroutines does not open 10,000 files and run into the operating system's limit.
+- **Read-ahead:** While the coroutine works on one batch of lines, the next batch is already being read in the pool.
+
+### **1. The I/O Pool and Async File Objects:**
+
+**Example:**
+```python
+import asyncio
+import functools
+import weakref
+from concurrent.futures import ThreadPoolExecutor
+
+class IOPool:
+    def __init__(self, threads=32, max_open=256):
+        self.executor = ThreadPoolExecutor(max_workers=threads, thread_name_prefix='file-io')
+        self.open_files = asyncio.Semaphore(max_open)
+
+    def run(self, function, *args, **kwargs):
+        loop = asyncio.get_running_loop()
+        return loop.run_in_executor(self.executor, functools.partial(function, *args, **kwargs))
+
+    def shutdown(self):
+        self.executor.shutdown()
+
+class AsyncFile:
+    def __init__(self, file, pool, read_ahead=256 * 1024):
+        self.file, self.pool, self.read_ahead = file, pool, read_ahead
+        self.pending = None  # A read-ahead that is still running
+
+    async def read(self, size=-1):
+        return await self.pool.run(self.file.read, size)
+
+    async def readline(self):
+        return await self.pool.run(self.file.readline)
+
+    async def write(self, data):
+        return await self.pool.run(self.file.write, data)
+
+    async def readlines(self):
+        self.pending = self.pool.run(self.file.readlines, self.read_ahead)
+        while True:
+            lines = await self.pending
+            if not lines:
+                self.pending = None
+                return
+            self.pending = self.pool.run(self.file.readlines, self.read_ahead)  # Read ahead
+            for line in lines:
+                yield line
+
+    def __aiter__(self):
+        return self.readlines()
+
+    async def close(self):
+        try:
+            if self.pending is not None:
+                await asyncio.gather(self.pending, return_exceptions=True)  # Let the read-ahead finish
+            await self.pool.run(self.file.close)
+        finally:
+            self.pool.open_files.release()
+
+class AsyncOpen:
+    def __init__(self, pool, path, mode, options):
+        self.pool, self.path, self.mode, self.options = pool, path, mode, options
+        self.file = None
+
+    async def open(self):
+        await self.pool.open_files.acquire()  # Waits while too many files are open
+        try:
+            file = await self.pool.run(open, self.path, self.mode, **self.options)
+        except BaseException:
+            self.pool.open_files.release()
+            raise
+        self.file = AsyncFile(file, self.pool)
+        return self.file
+
+    def __await__(self):
+        return self.open().__await__()
+
+    async def __aenter__(self):
+        return await self.open()
+
+    async def __aexit__(self, *exc_info):
+        await self.file.close()
+
+_pools = weakref.WeakKeyDictionary()  # One default pool per event loop
+
+def aopen(path, mode='r', pool=None, **options):
+    if pool is None:
+        loop = asyncio.get_running_loop()
+        if loop not in _pools:
+            _pools[loop] = IOPool()
+        pool = _pools[loop]
+    return AsyncOpen(pool, path, mode, options)
+```
+
+- `aopen()` works both as `async with aopen(path) as file:` and as `file = await aopen(path)` (followed by `await file.close()`).
+- Like a normal file object, one `AsyncFile` should be used by one coroutine at a time.
+
+### **2. Example:**
+
+- `fetch_data()` from Chapter 9 now reads a real file without stopping the event loop.
+- `read_many()` reads many files with a fixed number of worker coroutines. `asyncio.gather()` on 2000 coroutines would create and start 2000 tasks at once, which itself stalls the event loop.
+- `heartbeat()` wakes up every 5 ms and measures how late it wakes up. A late heartbeat means the event loop was blocked.
+
+**Example:**
+```python
+import os
+import time
+
+async def heartbeat(lags):
+    while True:
+        start = time.perf_counter()
+        await asyncio.sleep(0.005)
+        lags.append(time.perf_counter() - start - 0.005)
+
+async def fetch_data(path):
+    async with aopen(path, encoding='utf-8') as file:
+        return await file.read()
+
+async def read_many(paths, concurrency=64):
+    results = [None] * len(paths)
+    numbers = iter(range(len(paths)))
+
+    async def worker():
+        for number in numbers:  # The workers share one iterator
+            results[number] = await fetch_data(paths[number])
+
+    await asyncio.gather(*(worker() for _ in range(concurrency)))
+    return results
+
+def read_blocking(path):
+    with open(path, encoding='utf-8') as file:
+        return file.read()
+
+async def measure(label, read_all):
+    lags = []
+    task = asyncio.create_task(heartbeat(lags))
+    await asyncio.sleep(0.01)
+    start = time.perf_counter()
+    contents = await read_all()
+    seconds = time.perf_counter() - start
+    await asyncio.sleep(0.01)  # Let the heartbeat notice a stall at the end
+    task.cancel()
+    print('%-10s %d files in %.2f s, longest event loop stall %.1f ms' % (
+        label, len(contents), seconds, max(lags, default=0) * 1000))
+
+async def main():
+    paths = ['data/file%04d.txt' % i for i in range(2000)]
+
+    async def blocking():
+        return [read_blocking(path) for path in paths]  # Blocks the event loop
+
+    await measure('blocking', blocking)
+    await measure('aopen', lambda: read_many(paths))
+
+    async with aopen('data/big.log', encoding='utf-8') as file:
+        errors = 0
+        async for line in file:  # Lines are read ahead in the I/O pool
+            errors += 'ERROR' in line
+    print(errors)  # Output: 10000
+
+    async with aopen('data/result.txt', 'w', encoding='utf-8') as file:
+        await file.write('%d errors\n' % errors)
+
+os.makedirs('data', exist_ok=True)
+for i in range(2000):
+    with open('data/file%04d.txt' % i, 'w', encoding='utf-8') as file:
+        file.write('line %d\n' % i * 2000)
+with open('data/big.log', 'w', encoding='utf-8') as file:
+    file.writelines('%s request %d\n' % ('ERROR' if i % 10 == 0 else 'INFO', i) for i in range(100_000))
+
+asyncio.run(main())
+```
+
+- For small local files that are already cached in memory, handing every call to a thread costs more than the read itself, so the total time is longer. In exchange, the event loop never stops for long, so timers, network requests and other coroutines keep running while the files are read. On network file systems, where each `open()` can take milliseconds, reading many files concurrently is also much faster.
+
+### **Summary:**
+
+- **Never** call blocking file functions directly in a coroutine; they stop the whole event loop.
+- **Run** file operations in a dedicated, bounded thread pool with `loop.run_in_executor()` and `await` the results.
+- **Limit** the number of open files with an `asyncio.Semaphore`, and **read ahead** the next batch of lines while the current one is processed.
+
+======================================================================================
+
+TODO:Retrying file operations that fail only for a moment (retry with backoff)?
+
+### **Retrying File Operations That Fail Only for a Moment:**
+
+"Exception handling in file operations" catches `FileNotFoundError`, `PermissionError` and `IOError` and prints a message. Some errors, however, are **transient**: the same call succeeds if it is simply tried again a moment later. They are common on network file systems (NFS, SMB) and busy volumes:
+
+- **`EAGAIN`** ("resource temporarily unavailable") and **`EBUSY`** ("device or resource busy"): the file or device is locked or overloaded.
+- **`ESTALE`** ("stale file handle"): an NFS file was replaced on the server; opening it again usually works.
+- **`ETIMEDOUT`**: the server did not answer in time.
+
+Other errors are **permanent** (`ENOENT`: no such file, `EACCES`: permission denied, `ENOSPC`: disk full), and retrying them only wastes time. Every `OSError` has an `errno` attribute with the error code, and the `errno` module has a constant for each code, so the two kinds can be told apart.
+
+A **retry policy** decides how to try again:
+
+- **Exponential backoff:** Wait 50 ms, then 100 ms, 200 ms, ... up to a maximum, so a struggling server is not flooded with retries.
+- **Jitter:** Wait a **random** time between 0 and that value, so many workers that failed at the same moment do not all retry at the same moment again.
+- **Deadline:** A total time budget per operation. When the next wait would exceed it, the error is raised.
+- **Counters:** How many retries were needed, for which errors, and how much time they cost.
+
+### **1. The Retry Policy:**
+
+**Example:**
+```python
+import errno
+import os
+import random
+import threading
+import time
+from collections import Counter, defaultdict
+
+TRANSIENT = {errno.EAGAIN, errno.EBUSY, errno.ETIMEDOUT, errno.EINTR}
+if hasattr(errno, 'ESTALE'):  # Not defined on Windows
+    TRANSIENT.add(errno.ESTALE)
+
+class RetryPolicy:
+    def __init__(self, attempts=8, base_delay=0.05, max_delay=2.0, deadline=30.0, transient=TRANSIENT):
+        self.attempts, self.deadline, self.transient = attempts, deadline, transient
+        self.base_delay, self.max_delay = base_delay, max_delay
+
+    def delay(self, attempt):
+        return random.uniform(0, min(self.max_delay, self.base_delay * 2 ** attempt))  # "Full jitter"
+
+class Retrier:
+    def __init__(self, policy=None):
+        self.policy = policy or RetryPolicy()
+        self.lock = threading.Lock()
+        self.calls, self.retries, self.failures = Counter(), Counter(), Counter()
+        self.errors = Counter()
+        self.seconds_lost = defaultdict(float)
+
+    def call(self, operation, function, *args, **kwargs):
+        policy = self.policy
+        deadline = time.monotonic() + policy.deadline
+        with self.lock:
+            self.calls[operation] += 1
+        attempt = 0
+        while True:
+            start = time.monotonic()
+            try:
+                return function(*args, **kwargs)
+            except OSError as error:
+                delay = policy.delay(attempt)
+                attempt += 1
+                retry = (error.errno in policy.transient and attempt < policy.attempts
+                         and time.monotonic() + delay < deadline)
+                with self.lock:
+                    self.errors[errno.errorcode.get(error.errno, str(error.errno))] += 1
+                    self.seconds_lost[operation] += time.monotonic() - start + (delay if retry else 0)
+                    if retry:
+                        self.retries[operation] += 1
+                    else:
+                        self.failures[operation] += 1
+                if not retry:
+                    raise
+                time.sleep(delay)
+
+    def open(self, path, mode='r', **options):
+        return self.call('open', open, path, mode, **options)
+
+    def read(self, file, size=-1):
+        return self.call('read', file.read, size)
+
+    def write(self, file, data):
+        return self.call('write', file.write, data)
+
+    def rename(self, source, target):
+        return self.call('rename', os.replace, source, target)
+
+    def read_file(self, path, mode='rb', **options):
+        def read():
+            with open(path, mode, **options) as file:  # A new handle on every attempt (ESTALE)
+                return file.read()
+        return self.call('read_file', read)
+
+    def summary(self):
+        return {operation: {'calls': self.calls[operation], 'retries': self.retries[operation],
+                            'failures': self.failures[operation],
+                            'seconds lost': round(self.seconds_lost[operation], 3)}
+                for operation in self.calls}
+```
+
+- `read()` and `write()` retry a single call on an already open file. That is safe for errors raised before any data was transferred (like `EAGAIN`). After `ESTALE` the file handle itself is useless, so `read_file()` retries the whole open-and-read.
+- For writes that must not be duplicated, retry the whole operation: write a temporary file and `rename()` it into place, as in "Writing large text files safely and fast".
+- Python already retries `EINTR` (interrupted system call) automatically since Python 3.5; it is in the set for functions that do not.
+
+### **2. Example:**
+
+- `flaky()` simulates a busy network volume: it fails a given share of the calls with a transient error.
+
+```python
+def flaky(function, failure_rate, codes=(errno.EBUSY, errno.EAGAIN)):
+    def call(*args, **kwargs):
+        if random.random() < failure_rate:
+            code = random.choice(codes)
+            raise OSError(code, os.strerror(code))
+        return function(*args, **kwargs)
+    return call
+
+with open('report.txt', 'w') as file:
+    file.write('Hello, World!\n' * 100)
+
+def read_text(path):
+    with open(path) as file:
+        return file.read()
+
+busy_read = flaky(read_text, failure_rate=0.3)  # 30 % of all calls fail
+busy_replace = flaky(os.replace, failure_rate=0.3)
+
+retrier = Retrier(RetryPolicy(base_delay=0.001, max_delay=0.05, deadline=5.0))
+for _ in range(200):
+    content = retrier.call('read', busy_read, 'report.txt')
+    retrier.call('rename', busy_replace, 'report.txt', 'report_old.txt')
+    retrier.call('rename', busy_replace, 'report_old.txt', 'report.txt')
+print(len(content))  # Output: 1400
+print(retrier.summary())
+print(retrier.errors)
+
+try:
+    retrier.read_file('nonexistent_file.txt')  # Permanent error: no retry
+except FileNotFoundError:
+    print('File not found.', retrier.summary()['read_file']['failures'])  # Output: File not found. 1
+
+always_busy = Retrier(RetryPolicy(attempts=100, base_delay=0.01, max_delay=0.1, deadline=0.5))
+start = time.monotonic()
+try:
+    always_busy.call('lock', flaky(lambda: None, failure_rate=1.0, codes=(errno.EBUSY,)))
+except OSError as error:
+    print(errno.errorcode[error.errno], time.monotonic() - start < 0.5)  # Output: EBUSY True
+```
+
+- Jitter makes the exact number of retries and the time lost vary from run to run.
+
+### **Summary:**
+
+- **Classify** errors by `error.errno`: retry transient ones (`EAGAIN`, `EBUSY`, `ESTALE`, `ETIMEDOUT`), raise permanent ones immediately.
+- **Back off** exponentially with random jitter, and give up when the attempts or the deadline are used up.
+- **Retry** whole idempotent operations (open and read, write to a temporary file and rename), not half-finished ones.
+- **Count** retries, failures and time lost per operation to see how healthy your storage is.
+
+======================================================================================
+
+TODO:Storing many similar files only once (content-addressed, deduplicating store)?
+
+### **Storing Many Similar Files Only Once:**
+
+Daily exports, backups and log archives are often almost identical: yesterday's `export.csv` plus a few new or changed lines. Copying them with `shutil.copy` stores every byte again. A **content-addressed store** keeps each distinct piece of data exactly once:
+
+- **Content address:** Every piece of data is stored under the **hash** of its content (here **BLAKE2**, `hashlib.blake2b`, which is fast and cryptographically strong). Identical data has the same hash, so it is stored only once, no matter how many files contain it.
+- **Chunks:** Files are split into chunks of a few kilobytes, so two files that differ in one line share all other chunks.
+- **Content-defined chunking (CDC):** Chunks of a fixed size (every 8 KB) do not work: inserting one line at the start shifts every later chunk boundary, and no chunk matches anymore. CDC puts a boundary wherever a **rolling hash** of the last few bytes matches a pattern, so boundaries depend on the content and move together with it.
+- **Manifest:** For each stored file, a small JSON file lists its chunk hashes in order, which is all that is needed to rebuild it.
+- **Materializing:** Rebuilt files can be shared with **hard links** (`os.link`: several names for the same file on disk) or **reflinks** (copies that share data blocks until one of them is changed; Btrfs, XFS and APFS support them).
+- **Parallel ingest:** Several files are chunked and hashed at the same time in a process pool, and the store reports its **dedup ratio** (logical bytes / stored bytes) and ingest speed in MB/s.
+
+### **1. Content-Defined Chunking:**
+
+- The **gear hash** shifts the hash one bit to the left for every byte and adds a random value for that byte. After 32 bytes, older bytes have been shifted out, so the hash only depends on the last 32 bytes.
+- A boundary is placed where the top bits of the hash are all zero. The number of bits is chosen so that, after the first `min_size` bytes, a boundary comes about every `average - min_size` bytes (rounded down to a power of two); with the defaults, chunks are about 6 KB.
+- `min_size` and `max_size` keep chunks from getting too small or too large; the first `min_size` bytes of each chunk are not even looked at, which also saves time.
+
+**Example:**
+```python
+import hashlib
+
+GEAR = [int.from_bytes(hashlib.blake2b(bytes([byte]), digest_size=4).digest(), 'little') for byte in range(256)]
+
+def cut_points(data, min_size=2 * 1024, average=8 * 1024, max_size=64 * 1024):
+    bits = (average - min_size).bit_length() - 1
+    mask = ((1 << bits) - 1) << (32 - bits)  # The top `bits` bits of a 32-bit hash
+    gear, start, length = GEAR, 0, len(data)
+    while start < length:
+        end = min(start + max_size, length)
+        cut, hash = end, 0
+        for position, byte in enumerate(data[start + min_size:end], start + min_size):
+            hash = ((hash << 1) + gear[byte]) & 0xFFFFFFFF
+            if not hash & mask:
+                cut = position + 1
+                break
+        yield cut
+        start = cut
+```
+
+### **2. The Store:**
+
+- Chunks are saved as `chunks/<first 2 hex digits>/<hash>`, so no directory gets millions of entries.
+- Every chunk and manifest is written to a temporary file and renamed into place, so two workers can store the same chunk at the same time, and a crash never leaves a half-written chunk behind.
+
+**Example:**
+```python
+import errno
+import json
+import mmap
+import os
+import shutil
+import time
+from concurrent.futures import ProcessPoolExecutor
+
+FICLONE = 0x40049409  # Linux ioctl: make a file share all data blocks of another file (a reflink)
+
+def write_atomic(path, data):
+    temporary = '%s.%d.tmp' % (path, os.getpid())
+    with open(temporary, 'wb') as file:
+        file.write(data)
+    os.replace(temporary, path)
+
+def ingest(store, path, name):  # Runs in a worker process
+    file_hash, chunks, new_bytes = hashlib.blake2b(), [], 0
+    with open(path, 'rb') as file:
+        data = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ) if os.path.getsize(path) else b''
+        with memoryview(data) as view:
+            start = 0
+            for cut in store.split(view):
+                chunk = view[start:cut]
+                digest = hashlib.blake2b(chunk, digest_size=32).hexdigest()
+                file_hash.update(chunk)
+                chunk_path = store.chunk_path(digest)
+                if not os.path.exists(chunk_path):
+                    os.makedirs(os.path.dirname(chunk_path), exist_ok=True)
+                    write_atomic(chunk_path, chunk)
+                    new_bytes += len(chunk)
+                chunks.append([digest, len(chunk)])
+                chunk.release()
+                start = cut
+        if data:
+            data.close()
+    manifest = {'name': name, 'size': start, 'hash': file_hash.hexdigest(), 'chunks': chunks}
+    write_atomic(store.manifest_path(name), json.dumps(manifest).encode('utf-8'))
+    return start, new_bytes
+
+class ChunkStore:
+    def __init__(self, root, min_size=2 * 1024, average=8 * 1024, max_size=64 * 1024, content_defined=True):
+        self.root = root
+        self.sizes = (min_size, average, max_size)
+        self.content_defined = content_defined
+        for directory in ('chunks', 'manifests', 'files'):
+            os.makedirs(os.path.join(root, directory), exist_ok=True)
+
+    def split(self, data):
+        if self.content_defined:
+            return cut_points(data, *self.sizes)
+        size = self.sizes[1]
+        return [min(cut, len(data)) for cut in range(size, len(data) + size, size)]  # Fixed-size chunks
+
+    def chunk_path(self, digest):
+        return os.path.join(self.root, 'chunks', digest[:2], digest)
+
+    def manifest_path(self, name):
+        return os.path.join(self.root, 'manifests', hashlib.blake2b(name.encode('utf-8')).hexdigest()[:32] + '.json')
+
+    def add(self, paths, workers=None):
+        start = time.perf_counter()
+        with ProcessPoolExecutor(max_workers=workers) as executor:
+            results = list(executor.map(ingest, [self] * len(paths), paths, paths))
+        seconds = time.perf_counter() - start
+        size, new_bytes = sum(size for size, new in results), sum(new for size, new in results)
+        return {'files': len(paths), 'MB': round(size / 1e6, 1), 'new MB': round(new_bytes / 1e6, 2),
+                'MB/s': round(size / 1e6 / seconds, 1)}
+
+    def stats(self):
+        logical, stored = 0, {}
+        for entry in os.scandir(os.path.join(self.root, 'manifests')):
+            with open(entry.path, encoding='utf-8') as file:
+                manifest = json.load(file)
+            logical += manifest['size']
+            stored.update(manifest['chunks'])
+        physical = sum(stored.values())
+        return {'logical MB': round(logical / 1e6, 1), 'stored MB': round(physical / 1e6, 2),
+                'dedup ratio': round(logical / max(physical, 1), 1)}
+
+    def checkout(self, name, target, link='hardlink'):
+        with open(self.manifest_path(name), encoding='utf-8') as file:
+            manifest = json.load(file)
+        built = os.path.join(self.root, 'files', manifest['hash'])  # One rebuilt copy per content
+        if not os.path.exists(built):
+            temporary = '%s.%d.tmp' % (built, os.getpid())
+            with open(temporary, 'wb') as output:
+                for digest, size in manifest['chunks']:
+                    with open(self.chunk_path(digest), 'rb') as chunk:
+                        output.write(chunk.read())
+            os.chmod(temporary, 0o444)  # Shared through hard links: keep it read-only
+            os.replace(temporary, built)
+        # The target is never opened for writing: it may be a hard link to `built` from an earlier checkout
+        temporary = '%s.%d.tmp' % (target, os.getpid())
+        try:
+            if link == 'hardlink':
+                if os.path.exists(target) and os.path.samefile(built, target):
+                    return  # Already checked out
+                try:
+                    os.link(built, temporary)
+                    return os.replace(temporary, target)
+                except OSError as error:
+                    if error.errno not in (errno.EXDEV, errno.EPERM):
+                        raise
+                    # Other file system or no hard links: fall back to a reflink or a copy
+            try:
+                import fcntl
+                with open(built, 'rb') as source, open(temporary, 'wb') as output:
+                    fcntl.ioctl(output.fileno(), FICLONE, source.fileno())
+            except (ImportError, OSError):
+                shutil.copyfile(built, temporary)
+            os.replace(temporary, target)
+        except BaseException:
+            if os.path.lexists(temporary):
+                os.remove(temporary)
+            raise
+```
+
+- All hard links to a file are the **same** file: changing one changes all of them. That is why the rebuilt files are read-only; use `link='reflink'` for files that will be edited, which falls back to a normal copy where reflinks are not supported.
+- `checkout()` links or copies to a temporary name and renames it over the target, so checking out over an existing file, even an earlier hard link, never writes into the shared copy.
+
+### **3. Example:**
+
+- Eight daily exports of 1 MB, each with a few lines changed and a few inserted compared to the day before.
+
+```python
+import random
+
+if __name__ == '__main__':
+    random.seed(1)
+    lines = ['%d,Alice %d,%d,New York\n' % (i, i, i % 90) for i in range(40_000)]
+    paths = []
+    for day in range(8):
+        for _ in range(20):
+            lines[random.randrange(len(lines))] = 'changed on day %d\n' % day
+        lines.insert(random.randrange(len(lines)), 'inserted on day %d\n' % day)
+        paths.append('export_day%d.csv' % day)
+        with open(paths[-1], 'w') as file:
+            file.writelines(lines)
+
+    for content_defined in (False, True):
+        root = 'store_cdc' if content_defined else 'store_fixed'
+        store = ChunkStore(root, content_defined=content_defined)
+        print('content-defined' if content_defined else 'fixed-size     ', store.add(paths), store.stats())
+
+    store.checkout('export_day7.csv', 'restored.csv')
+    with open('restored.csv', 'rb') as restored, open('export_day7.csv', 'rb') as original:
+        print(restored.read() == original.read())  # Output: True
+    store.checkout('export_day7.csv', 'restored_again.csv')
+    print(os.path.samefile('restored.csv', 'restored_again.csv'))  # Output: True
+    store.checkout('export_day7.csv', 'restored.csv')  # Again, over the earlier checkout
+    store.checkout('export_day7.csv', 'restored_copy.csv', link='reflink')
+    with open('restored_copy.csv', 'rb') as restored, open('export_day7.csv', 'rb') as original:
+        print(restored.read() == original.read())  # Output: True
+```
+
+- With fixed-size chunks, an inserted line changes every chunk after it, so each export is stored almost completely. With content-defined chunks, only the chunks around the changes are new.
+- The chunking loop runs in Python, at about 5 to 10 MB/s per process; the process pool multiplies that by the number of cores. Chunking libraries written in C or Rust are many times faster.
+
+### **Summary:**
+
+- **Address** data by its BLAKE2 hash, so identical data is stored once.
+- **Split** files with content-defined chunking, so insertions and deletions only change the chunks around them.
+- **Ingest** files in parallel worker processes, writing chunks atomically.
+- **Materialize** files with hard links or reflinks instead of copies, and report the dedup ratio and MB/s.
+
+======================================================================================
+
+TODO:Processing new files as soon as they arrive (watching a directory)?
+
+### **Processing New Files as Soon as They Arrive:**
+
+A common way to process incoming CSV and JSON files is to rescan the input directory every minute with `os.listdir()` and process whatever is new. This has two costs: a new file waits up to a whole interval before it is processed, and every rescan of a directory with many files costs CPU time and disk access, even when nothing has changed.
+
+A **file system watcher** asks the operating system to report changes instead:
+
+- **inotify (Linux):** The kernel sends an event when a file in a watched directory is created, written and closed, renamed or deleted. Python has no built-in module for it, but `ctypes` can call the C library functions `inotify_init1()` and `inotify_add_watch()` directly, and the events are read from a file descriptor with `os.read()`.
+- **Polling fallback:** On other systems, the watcher takes a **snapshot** of the directory (`os.scandir` with the modification time and size of every file) at a fixed interval and compares it with the previous one.
+- **Batching and debouncing:** Files often arrive in bursts (an export job writes 500 files at once). Changes are collected until no new change has arrived for a short **quiet period** (e.g. 50 ms), or until a maximum delay is reached, and then handed to the processing function as one batch.
+- **Complete files only:** With inotify, only `IN_CLOSE_WRITE` (a file opened for writing was closed) and `IN_MOVED_TO` (a file was renamed into the directory, like the temporary files of "Writing large text files safely and fast") are reported, so a half-written file is never processed. Hidden files (starting with `.`) are ignored.
+
+### **1. The Watcher Base Class:**
+
+- Subclasses only implement `wait(timeout)`, which returns a list of `(path, kind)` changes, where kind is `'changed'` or `'deleted'`.
+
+**Example:**
+```python
+import ctypes
+import ctypes.util
+import errno
+import os
+import select
+import struct
+import threading
+import time
+
+def walk_files(root):
+    stack = [root]
+    while stack:
+        with os.scandir(stack.pop()) as entries:
+            for entry in entries:
+                if entry.is_dir(follow_symlinks=False):
+                    stack.append(entry.path)
+                else:
+                    yield entry
+
+class Watcher:
+    def __init__(self, root, callback, suffixes=('.csv', '.json', '.jsonl'), debounce=0.05, max_delay=1.0):
+        self.root, self.callback, self.suffixes = root, callback, suffixes
+        self.debounce, self.max_delay = debounce, max_delay
+        self.stopped = threading.Event()
+        self.batches = 0
+
+    def wanted(self, path):
+        name = os.path.basename(path)
+        return not name.startswith('.') and name.endswith(self.suffixes)
+
+    def run(self):
+        pending, first, last = {}, 0.0, 0.0
+        while not self.stopped.is_set():
+            timeout = 0.1
+            if pending:
+                timeout = max(0.0, min(last + self.debounce, first + self.max_delay) - time.monotonic())
+            for path, kind in self.wait(min(timeout, 0.1)):
+                if self.wanted(path):
+                    last = time.monotonic()
+                    if not pending:
+                        first = last
+                    pending[path] = kind  # Several changes to one file become one
+            now = time.monotonic()
+            if pending and (now >= last + self.debounce or now >= first + self.max_delay):
+                self.emit(pending)
+                pending = {}
+        if pending:
+            self.emit(pending)
+        self.close()
+
+    def emit(self, pending):
+        self.batches += 1
+        self.callback(sorted(pending.items()))
+
+    def start(self):
+        self.thread = threading.Thread(target=self.run, daemon=True)
+        self.thread.start()
+        return self
+
+    def stop(self):
+        self.stopped.set()
+        self.thread.join()
+
+    def close(self):
+        pass
+```
+
+### **2. Watching with inotify:**
+
+- Each event is a 16-byte header (`watch descriptor, mask, cookie, name length`) followed by the file name, padded with zero bytes.
+- inotify watches single directories, so every subdirectory gets its own watch. Files written into a new subdirectory before its watch was added are found by scanning it once.
+- If events arrive faster than they are read, the kernel drops them and sends `IN_Q_OVERFLOW`; the watcher then reports every file as changed.
+
+**Example:**
+```python
+IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO = 0x8, 0x40, 0x80
+IN_CREATE, IN_DELETE, IN_Q_OVERFLOW, IN_IGNORED, IN_ISDIR = 0x100, 0x200, 0x4000, 0x8000, 0x40000000
+IN_NONBLOCK, IN_CLOEXEC = 0o4000, 0o2000000
+EVENT = struct.Struct('iIII')
+
+class InotifyWatcher(Watcher):
+    MASK = IN_CLOSE_WRITE | IN_MOVED_TO | IN_MOVED_FROM | IN_CREATE | IN_DELETE
+
+    def __init__(self, root, callback, **options):
+        super().__init__(root, callback, **options)
+        self.libc = ctypes.CDLL(ctypes.util.find_library('c'), use_errno=True)
+        self.fd = self.libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), 'inotify_init1() failed')
+        self.directories = {}  # Watch descriptor -> directory
+        self.add_tree(root)
+
+    def add_tree(self, top):
+        found, stack = [], [top]
+        while stack:
+            directory = stack.pop()
+            descriptor = self.libc.inotify_add_watch(self.fd, os.fsencode(directory), self.MASK)
+            if descriptor < 0:
+                code = ctypes.get_errno()
+                if code == errno.ENOENT:
+                    continue  # Already deleted again
+                raise OSError(code, os.strerror(code), directory)
+            self.directories[descriptor] = directory
+            with os.scandir(directory) as entries:
+                for entry in entries:
+                    if entry.is_dir(follow_symlinks=False):
+                        stack.append(entry.path)
+                    else:
+                        found.append((entry.path, 'changed'))
+        return found
+
+    def wait(self, timeout):
+        if not select.select([self.fd], [], [], timeout)[0]:
+            return []
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return []
+        changes, offset = [], 0
+        while offset < len(data):
+            descriptor, mask, cookie, length = EVENT.unpack_from(data, offset)
+            name = data[offset + EVENT.size:offset + EVENT.size + length].rstrip(b'\0')
+            offset += EVENT.size + length
+            if mask & IN_Q_OVERFLOW:
+                changes += [(entry.path, 'changed') for entry in walk_files(self.root)]
+                continue
+            if mask & IN_IGNORED:  # The directory was deleted
+                self.directories.pop(descriptor, None)
+                continue
+            if descriptor not in self.directories:
+                continue
+            path = os.path.join(self.directories[descriptor], os.fsdecode(name))
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO):
+                    changes += self.add_tree(path)
+            elif mask & (IN_CLOSE_WRITE | IN_MOVED_TO):
+                changes.append((path, 'changed'))
+            elif mask & (IN_DELETE | IN_MOVED_FROM):
+                changes.append((path, 'deleted'))
+        return changes
+
+    def close(self):
+        os.close(self.fd)
+```
+
+### **3. Polling Fallback:**
+
+- A file that is still being written changes its size or modification time between polls. A changed file is therefore only reported once it has stayed the same for two polls in a row, which adds one interval to the delay.
+
+**Example:**
+```python
+class PollingWatcher(Watcher):
+    def __init__(self, root, callback, interval=1.0, **options):
+        super().__init__(root, callback, **options)
+        self.interval = interval
+        self.snapshot = self.scan()
+        self.changing = set()  # Changed at the last poll, not reported yet
+        self.next_poll = time.monotonic() + interval
+
+    def scan(self):
+        snapshot = {}
+        for entry in walk_files(self.root):
+            if self.wanted(entry.path):
+                try:
+                    stat = entry.stat()
+                except FileNotFoundError:
+                    continue  # Deleted while scanning
+                snapshot[entry.path] = (stat.st_mtime_ns, stat.st_size)
+        return snapshot
+
+    def wait(self, timeout):
+        delay = self.next_poll - time.monotonic()
+        if delay > timeout:
+            time.sleep(timeout)
+            return []
+        time.sleep(max(delay, 0.0))
+        self.next_poll = time.monotonic() + self.interval
+        old, self.snapshot = self.snapshot, self.scan()
+        changes = [(path, 'deleted') for path in old.keys() - self.snapshot.keys()]
+        for path, state in self.snapshot.items():
+            if old.get(path) != state:
+                self.changing.add(path)  # Possibly still being written: check again at the next poll
+            elif path in self.changing:
+                self.changing.discard(path)
+                changes.append((path, 'changed'))
+        self.changing &= self.snapshot.keys()
+        return changes
+
+def watch(root, callback, interval=1.0, **options):
+    try:
+        return InotifyWatcher(root, callback, **options).start()
+    except (AttributeError, OSError, TypeError):  # Not Linux, or no inotify in the C library
+        return PollingWatcher(root, callback, interval, **options).start()
+```
+
+### **4. Example:**
+
+- `deliver()` writes files the safe way: into a hidden temporary file, then renamed into place.
+- `process()` is the processing function; in a real job it would read each file with the readers from the previous sections.
+
+**Example:**
+```python
+import tempfile
+
+def deliver(directory, name, text):
+    descriptor, temporary = tempfile.mkstemp(dir=directory, prefix='.')
+    with os.fdopen(descriptor, 'w') as file:
+        file.write(text)
+    os.replace(temporary, os.path.join(directory, name))
+
+def measure(label, make_watcher, files=200):
+    delivered, processed = {}, {}
+
+    def process(batch):
+        now = time.perf_counter()
+        for path, kind in batch:
+            if kind == 'changed':
+                processed.setdefault(path, now)
+
+    watcher = make_watcher(process)
+    start_cpu = time.process_time()
+    time.sleep(2)  # Idle: nothing arrives
+    idle_cpu = time.process_time() - start_cpu
+    for i in range(files):
+        path = os.path.join('incoming', 'orders_%s_%03d.csv' % (label, i))
+        deliver('incoming', os.path.basename(path), 'id,amount\n%d,9.99\n' % i)
+        delivered[path] = time.perf_counter()
+        if i % 20 == 19:
+            time.sleep(0.2)  # Files arrive in bursts of 20
+    while len(processed) < files:
+        time.sleep(0.01)
+    watcher.stop()
+    latencies = sorted(processed[path] - delivered[path] for path in delivered)
+    print('%-8s %d files in %d batches, median latency %4.0f ms, idle CPU %.0f ms per second' % (
+        label, files, watcher.batches, latencies[files // 2] * 1000, idle_cpu / 2 * 1000))
+
+os.makedirs('incoming/archive', exist_ok=True)
+for i in range(20_000):  # Files that were processed earlier
+    with open('incoming/archive/old_%05d.csv' % i, 'w') as file:
+        file.write('id,amount\n')
+
+if hasattr(os, 'O_NONBLOCK') and ctypes.util.find_library('c'):
+    measure('inotify', lambda callback: InotifyWatcher('incoming', callback).start())
+measure('polling', lambda callback: PollingWatcher('incoming', callback, interval=1.0).start())
+```
+
+- inotify reports each file within about the quiet period (50 ms) and uses no CPU while nothing happens. Polling waits between one and two intervals (until a file has stayed the same for two polls) and rescans all 20,000 old files every second.
+
+### **Summary:**
+
+- **Watch** directories with inotify (through `ctypes` on Linux) instead of rescanning them, and fall back to comparing `os.scandir` snapshots elsewhere.
+- **Report** only complete files: `IN_CLOSE_WRITE` and `IN_MOVED_TO`, or files that stopped changing between polls.
+- **Batch and debounce** changes with a quiet period and a maximum delay, and hand each batch to the processing function.
+- **Rescan** once after an inotify queue overflow, so no file is missed.
+
 ======================================================================================
 """
\ No newline at end of file
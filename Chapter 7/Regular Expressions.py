@@ -544,4 +544,161 @@ Use the `re` module to handle all regex-related operations in Python.
 
 
 ======================================================================================
+TODO:Building a ranked search index with regular expressions (BM25)?
+
+### **Building a Ranked Search Index (Short Overview)**
+
+- **Why Not Just `grep`?**
+  - `grep` (or `re.search()` over every file) reads the whole corpus for every query and returns matches in file order, not by relevance.
+  - An **inverted index** maps each token to the places it occurs (its **postings**), so a query only touches the postings of its own words.
+  - **BM25** ranks the matching sections: rare words count more than common ones, repeated words count more (with diminishing returns), and long sections are not favoured just for being long.
+
+- **Tokenizing with `re`**:
+  - `re.findall()` with a character class splits text into lowercase words.
+  - **Example**:
+    ```python
+    import re
+
+    TOKEN = re.compile(r'[a-z0-9_]+')
+
+    def tokenize(text):
+        return TOKEN.findall(text.lower())
+
+    print(tokenize('Use re.findall() for ALL matches'))  # Output: ['use', 're', 'findall', 'for', 'all', 'matches']
+    ```
+
+- **Splitting the Chapters into Sections**:
+  - Each `TODO:` section becomes one document; its byte offset in the chapter file is kept so a tool can `seek()` straight to it.
+  - **Example**:
+    ```python
+    import glob
+    import os
+
+    SEPARATOR = re.compile(rb'^=+$', re.M)
+
+    def read_sections(paths):
+        for path in paths:
+            with open(path, 'rb') as file:
+                data = file.read()
+            chapter = os.path.basename(os.path.dirname(path))
+            start = 0
+            for match in list(SEPARATOR.finditer(data)) + [None]:
+                end = match.start() if match else len(data)
+                text = data[start:end].decode('utf-8').strip().strip('"').strip()
+                if text:
+                    title = text.splitlines()[0].removeprefix('TODO:')
+                    yield chapter, title, start, text
+                start = match.end() if match else end
+    ```
+
+- **Compact On-Disk Postings**:
+  - All postings are stored in one `array('I')` of unsigned 32-bit integers: for every section containing the token `[section, count, position, position, ...]`.
+  - A small JSON header holds the section list and the vocabulary (`token -> [start, length, document frequency]`).
+  - The file layout is `header size (8 bytes) | JSON header | padding | postings`.
+  - **Example**:
+    ```python
+    import array
+    import json
+    import struct
+    from collections import defaultdict
+
+    def build_index(sections, path='chapters.idx'):
+        postings, frequencies, documents = defaultdict(list), defaultdict(int), []
+        for number, (chapter, title, offset, text) in enumerate(sections):
+            positions = defaultdict(list)
+            tokens = tokenize(text)
+            for position, token in enumerate(tokens):
+                positions[token].append(position)
+            for token, where in positions.items():
+                postings[token] += [number, len(where), *where]
+                frequencies[token] += 1
+            documents.append([chapter, title, offset, len(tokens)])
+
+        data, vocabulary = array.array('I'), {}
+        for token in sorted(postings):
+            vocabulary[token] = [len(data), len(postings[token]), frequencies[token]]
+            data.extend(postings[token])
+
+        header = json.dumps({'documents': documents, 'vocabulary': vocabulary}).encode('utf-8')
+        header += b' ' * (-(8 + len(header)) % data.itemsize)  # Align the postings
+        with open(path + '.tmp', 'wb') as file:
+            file.write(struct.pack('<Q', len(header)) + header)
+            data.tofile(file)
+        os.replace(path + '.tmp', path)
+    ```
+
+- **Loading with `mmap` and Ranking with BM25**:
+  - `mmap` maps the file into memory without reading it; `memoryview(...).cast('I')` reads the postings of a token directly from the mapped pages, so a cold start only parses the header.
+  - Words in double quotes are a **phrase query**: the words must appear next to each other, which is checked with the stored positions.
+  - **Example**:
+    ```python
+    import math
+    import mmap
+
+    class SearchIndex:
+        def __init__(self, path='chapters.idx'):
+            with open(path, 'rb') as file:
+                self.map = mmap.mmap(file.fileno(), 0, access=mmap.ACCESS_READ)
+            size, = struct.unpack_from('<Q', self.map)
+            header = json.loads(self.map[8:8 + size])
+            self.documents, self.vocabulary = header['documents'], header['vocabulary']
+            self.data = memoryview(self.map)[8 + size:].cast('I')
+            self.average_length = sum(doc[3] for doc in self.documents) / max(len(self.documents), 1)
+
+        def postings(self, token):
+            if token not in self.vocabulary:
+                return {}
+            start, length, frequency = self.vocabulary[token]
+            values, result, i = self.data[start:start + length], {}, 0
+            while i < length:
+                document, count = values[i], values[i + 1]
+                result[document] = values[i + 2:i + 2 + count]
+                i += 2 + count
+            return result
+
+        def has_phrase(self, words, document):
+            positions = [set(self.postings(word).get(document, ())) for word in words]
+            return any(all(start + i in positions[i] for i in range(1, len(words)))
+                       for start in positions[0])
+
+        def search(self, query, limit=5, k1=1.5, b=0.75):
+            phrases = [tokenize(phrase) for phrase in re.findall(r'"([^"]+)"', query)]
+            scores = defaultdict(float)
+            for token in set(tokenize(query)):
+                hits = self.postings(token)
+                idf = math.log(1 + (len(self.documents) - len(hits) + 0.5) / (len(hits) + 0.5))
+                for document, positions in hits.items():
+                    count, length = len(positions), self.documents[document][3]
+                    scores[document] += idf * count * (k1 + 1) / (
+                        count + k1 * (1 - b + b * length / self.average_length))
+            matches = [doc for doc in scores if all(self.has_phrase(words, doc) for words in phrases if words)]
+            matches.sort(key=scores.get, reverse=True)
+            return [(round(scores[doc], 2), *self.documents[doc][:3]) for doc in matches[:limit]]
+
+        def close(self):
+            self.data.release()
+            self.map.close()
+    ```
+
+- **Usage**:
+  - Your own notes are just more `(chapter, title, offset, text)` documents added to the same index.
+  - **Example**:
+    ```python
+    import time
+
+    notes = [('Notes', 'Team regex tips', 0, 'Prefer re.compile for patterns used in loops.')]
+    build_index(list(read_sections(sorted(glob.glob('Chapter */*.py')))) + notes)
+
+    start = time.perf_counter()
+    index = SearchIndex()
+    for query in ['exception handling', '"context manager"', 're.compile loops']:
+        print(query, index.search(query, limit=3))
+    print('Cold start and 3 queries: %.1f ms' % ((time.perf_counter() - start) * 1000))
+    index.close()
+    ```
+
+Use `re` to tokenize, an inverted index to avoid scanning every file, BM25 to rank the results, and `mmap` so that loading the index costs only its small header.
+
+======================================================================================
+
 """
\ No newline at end of file
@@ -293,4 +293,293 @@ Debugging is essential for identifying and fixing errors in your code. Using a c
 
 ======================================================================================
 
+TODO:Checking `# Output:` comments automatically?
+
+### **Checking `# Output:` Comments Automatically (Short Overview)**
+
+- **Purpose**: Many examples in these chapters document their result inline, e.g. `get_stats(10, 5)  # Output: (15, 5)` or `re.findall(r'[0-9]+', 'abc123def456')  # Output: ['123', '456']`. A checker can turn every such comment into an assertion, so wrong or outdated comments are found automatically.
+
+- **Turning Comments into Assertions**:
+  - The `ast` module parses the example, and an `ast.NodeTransformer` replaces every statement that ends with `# Output:` by a call to a `__check__()` helper.
+  - **`print(...)`**: The printed text (`str` of the arguments joined by spaces) is compared with the comment.
+  - **Expressions**: The `repr()` of the value is compared (the `str()` is also accepted).
+  - **Assignments**: The assigned variable is compared, e.g. `squares = [x**2 for x in range(5)]  # Output: [0, 1, 4, 9, 16]`.
+  - **Example**:
+    ```python
+    import ast
+
+    MARKER = '# Output:'
+
+    class OutputChecks(ast.NodeTransformer):
+        def __init__(self, expected):
+            self.expected = expected  # Line number -> expected text
+
+        def check(self, node, value, is_print):
+            call = ast.parse('__check__(%d, None, %r, %r)'
+                             % (node.end_lineno, self.expected[node.end_lineno], is_print)).body[0]
+            call.value.args[1] = value
+            return ast.copy_location(call, node)
+
+        def visit_Expr(self, node):
+            if node.end_lineno not in self.expected:
+                return node
+            value = node.value
+            if isinstance(value, ast.Call) and getattr(value.func, 'id', None) == 'print':
+                return self.check(node, ast.Tuple(value.args, ast.Load()), True)
+            return self.check(node, value, False)
+
+        def visit_Assign(self, node):
+            if node.end_lineno not in self.expected:
+                return node
+            target = ast.parse(ast.unparse(node.targets[0]), mode='eval').body
+            return [node, self.check(node, target, False)]
+
+    def compile_checks(code):
+        expected = {number: line.split(MARKER, 1)[1].strip()
+                    for number, line in enumerate(code.splitlines(), 1) if MARKER in line}
+        if not expected:
+            return None
+        try:
+            tree = OutputChecks(expected).visit(ast.parse(code))
+        except SyntaxError:
+            return None
+        return ast.unparse(ast.fix_missing_locations(tree))
+
+    print(compile_checks('result = get_stats(10, 5)\nprint(result)  # Output: (15, 5)'))
+    # Output: result = get_stats(10, 5)
+    #         __check__(2, (result,), '(15, 5)', True)
+    ```
+
+- **Evaluating in Batches in Worker Processes**:
+  - Starting one process per example is expensive for tiny snippets, so the compiled checks are sent to a `ProcessPoolExecutor` in **batches** and executed with `exec()` inside the workers.
+  - The printed output of the examples is captured with `contextlib.redirect_stdout`.
+  - **Example**:
+    ```python
+    import contextlib
+    import io
+
+    def normalize(text):
+        return ' '.join(text.split())
+
+    def run_checks(source):
+        results = []
+
+        def __check__(line, value, expected, is_print):
+            candidates = [' '.join(map(str, value))] if is_print else [repr(value), str(value)]
+            passed = normalize(expected) in map(normalize, candidates)
+            results.append({'line': line, 'expected': expected, 'actual': candidates[0], 'passed': passed})
+
+        try:
+            with contextlib.redirect_stdout(io.StringIO()):
+                exec(source, {'__name__': '__example__', '__check__': __check__})
+            error = None
+        except Exception as e:
+            error = '%s: %s' % (type(e).__name__, e)
+        return {'checks': results, 'error': error}
+
+    def check_batch(batch):
+        return [(key, run_checks(source)) for key, source in batch]
+    ```
+
+- **Skipping Unchanged Examples with a Result Cache**:
+  - Results are stored in a JSON file keyed by the SHA-256 hash of the example, so a rerun only evaluates examples whose code changed.
+  - **Example**:
+    ```python
+    import hashlib
+    import json
+    import os
+    from concurrent.futures import ProcessPoolExecutor
+
+    def check_outputs(snippets, cache_path='.output_cache.json', batch_size=25):
+        try:
+            with open(cache_path, 'r', encoding='utf-8') as file:
+                cache = json.load(file)
+        except (FileNotFoundError, ValueError):
+            cache = {}
+
+        keys, todo = {}, {}
+        for name, code in snippets:
+            key = hashlib.sha256(code.encode('utf-8')).hexdigest()
+            if key in cache or key in todo:
+                keys[name] = key
+                continue
+            source = compile_checks(code)
+            if source is not None:
+                keys[name] = key
+                todo[key] = source
+
+        batches = [list(todo.items())[i:i + batch_size] for i in range(0, len(todo), batch_size)]
+        if batches:
+            with ProcessPoolExecutor() as executor:
+                for results in executor.map(check_batch, batches):
+                    cache.update(results)
+            with open(cache_path + '.tmp', 'w', encoding='utf-8') as file:
+                json.dump(cache, file)
+            os.replace(cache_path + '.tmp', cache_path)
+        return {name: cache[key] for name, key in keys.items()}, len(todo)
+    ```
+
+- **Usage**:
+  ```python
+  snippets = [
+      ('get_stats', 'def get_stats(a, b):\n    return a + b, a - b\n\nprint(get_stats(10, 5))  # Output: (15, 5)'),
+      ('findall', "import re\nre.findall(r'[0-9]+', 'abc123def456')  # Output: ['123', '456']"),
+      ('squares', 'squares = [x**2 for x in range(5)]  # Output: [0, 1, 4, 9, 16]'),
+      ('wrong', 'len([1, 2, 3])  # Output: 4'),
+  ]
+
+  if __name__ == '__main__':
+      for run in range(2):
+          results, evaluated = check_outputs(snippets)
+          print('Run %d: %d examples evaluated' % (run + 1, evaluated))  # Second run: 0
+      for name, result in results.items():
+          for check in result['checks']:
+              if not check['passed']:
+                  print('%s line %d: expected %s, got %s' % (name, check['line'], check['expected'], check['actual']))
+      # Output: wrong line 1: expected 4, got 3
+  ```
+
+Checking `# Output:` comments at scale keeps the documentation honest: comments become assertions, cheap examples are evaluated in batches on all cores, and a hash-keyed cache means only the examples you edit are evaluated again.
+
+======================================================================================
+
+TODO:Profiling the resources used by each example?
+
+### **Profiling the Resources Used by Each Example (Short Overview)**
+
+- **Purpose**: Find out which examples are slow or memory hungry, especially when their inputs are scaled up (more threads, more tasks, bigger files). A debugger shows *where* a program is; a resource profile shows *what it costs*.
+
+- **What to Measure**:
+  - **Wall time**: `time.perf_counter()` around the example.
+  - **CPU time**: User and system time from `resource.getrusage(resource.RUSAGE_SELF)`. Wall time much higher than CPU time means the example is waiting (sleeping, I/O, locks).
+  - **Peak RSS**: `ru_maxrss` from `getrusage()`, the most physical memory the process used (kilobytes on Linux).
+  - **Allocations**: `tracemalloc` gives the peak size of Python allocations and the number of memory blocks still allocated at the end.
+  - **System calls**: On Linux, `/proc/self/io` counts read-like (`syscr`) and write-like (`syscw`) system calls; the number of voluntary context switches (`ru_nvcsw`) shows how often the process waited.
+
+- **Running Each Example in Its Own Process**:
+  - Every example runs in a child process (`multiprocessing` with the `fork` start method), so its numbers are not mixed with the profiler's own work or with other examples.
+  - The child sends its measurements back through a `Pipe`.
+  - Examples read their input size from the variable `N`, so the same example can be profiled at several sizes.
+  - **Example**:
+    ```python
+    import multiprocessing
+    import resource
+    import time
+    import tracemalloc
+
+    def read_syscalls():
+        try:
+            with open('/proc/self/io') as file:
+                fields = dict(line.split(': ') for line in file.read().splitlines())
+            return int(fields['syscr']) + int(fields['syscw'])
+        except OSError:
+            return None  # Not available on this system
+
+    def profile_in_child(code, n, connection):
+        before, syscalls = resource.getrusage(resource.RUSAGE_SELF), read_syscalls()
+        tracemalloc.start()
+        start, error = time.perf_counter(), None
+        try:
+            exec(compile(code, '<example>', 'exec'), {'__name__': '__main__', 'N': n})
+        except BaseException as e:  # Also SystemExit and KeyboardInterrupt
+            error = '%s: %s' % (type(e).__name__, e)
+        wall = time.perf_counter() - start
+        after = resource.getrusage(resource.RUSAGE_SELF)
+        if syscalls is not None:
+            syscalls = read_syscalls() - syscalls
+        peak = tracemalloc.get_traced_memory()[1]
+        blocks = sum(stat.count for stat in tracemalloc.take_snapshot().statistics('filename'))
+        tracemalloc.stop()
+        connection.send({
+            'wall': wall,
+            'cpu': (after.ru_utime - before.ru_utime) + (after.ru_stime - before.ru_stime),
+            'peak_rss_kb': after.ru_maxrss,
+            'peak_alloc': peak,
+            'blocks': blocks,
+            'syscalls': syscalls,
+            'waits': after.ru_nvcsw - before.ru_nvcsw,
+            'error': error,
+        })
+
+    def profile(name, code, n):
+        context = multiprocessing.get_context('fork')
+        receiver, sender = context.Pipe(duplex=False)
+        process = context.Process(target=profile_in_child, args=(code, n, sender))
+        process.start()
+        sender.close()  # Only the child holds the sending end, so recv() sees EOF if it dies
+        try:
+            result = receiver.recv()
+        except EOFError:  # os._exit() or a crash: nothing was sent
+            process.join()
+            result = dict.fromkeys(['wall', 'cpu', 'peak_rss_kb', 'peak_alloc', 'blocks', 'syscalls', 'waits'])
+            result['error'] = 'process exited with code %s without a result' % process.exitcode
+        process.join()
+        return {'name': name, 'n': n, **result}
+    ```
+
+- **A Sortable Report**:
+  ```python
+  COLUMNS = ['wall', 'cpu', 'peak_rss_kb', 'peak_alloc', 'blocks', 'syscalls', 'waits']
+
+  def report(results, sort_by='wall'):
+      print('%-16s %8s' % ('example', 'N') + ''.join('%13s' % column for column in COLUMNS))
+      for result in sorted(results, key=lambda r: r[sort_by] or 0, reverse=True):
+          values = ''.join('%13.4f' % result[c] if isinstance(result[c], float) else '%13s' % result[c]
+                           for c in COLUMNS)
+          print('%-16s %8d' % (result['name'], result['n']) + values)
+          if result['error']:
+              print('    ' + result['error'])
+  ```
+
+- **Usage**:
+  - The examples below are the `ThreadPoolExecutor`, `asyncio.gather`, CSV and JSON examples from the other chapters, with their input size replaced by `N`.
+  ```python
+  EXAMPLES = {
+      'thread pool': '\n'.join([
+          'from concurrent.futures import ThreadPoolExecutor',
+          'def task(n):',
+          '    return n * 2',
+          'with ThreadPoolExecutor(max_workers=3) as executor:',
+          '    results = list(executor.map(task, range(N)))',
+      ]),
+      'asyncio.gather': '\n'.join([
+          'import asyncio',
+          'async def task(i):',
+          '    await asyncio.sleep(0.01)',
+          'async def main():',
+          '    await asyncio.gather(*(task(i) for i in range(N)))',
+          'asyncio.run(main())',
+      ]),
+      'csv write/read': '\n'.join([
+          'import csv, os, tempfile',
+          'path = os.path.join(tempfile.mkdtemp(), "data.csv")',
+          'with open(path, "w", newline="") as file:',
+          '    csv.writer(file).writerows(["Alice", i, "New York"] for i in range(N))',
+          'with open(path, "r") as file:',
+          '    rows = list(csv.reader(file))',
+      ]),
+      'json dump/load': '\n'.join([
+          'import json, os, tempfile',
+          'path = os.path.join(tempfile.mkdtemp(), "data.json")',
+          'with open(path, "w") as file:',
+          '    json.dump([{"name": "Alice", "age": i} for i in range(N)], file, indent=4)',
+          'with open(path, "r") as file:',
+          '    data = json.load(file)',
+      ]),
+  }
+
+  if __name__ == '__main__':
+      results = [profile(name, code, n) for name, code in EXAMPLES.items() for n in (100, 10000)]
+      report(results, sort_by='cpu')
+  ```
+  - Sorting by another column (`report(results, sort_by='peak_alloc')`) answers another question: the thread pool example creates one future per item, and the `asyncio.gather` example keeps one task per item in memory, so both grow with `N`.
+
+- **Notes**:
+  - `resource` and the `fork` start method are only available on Unix; `/proc/self/io` only on Linux (the column shows `None` elsewhere).
+  - `tracemalloc` slows the example down, so compare wall and CPU times with each other rather than with a run without profiling.
+
+Profiling each example separately, with the same set of numbers for every one of them, makes it easy to sort them by cost and to spot the ones that do not scale.
+
+======================================================================================
+
 """
\ No newline at end of file
@@ -518,4 +518,540 @@ TODO:Working with regular expressions (re module)?
 
 ======================================================================================
 
+TODO:Caching parsed files on disk (mtime and hash keys)?
+
+### **Caching Parsed Files on Disk (Short Overview)**
+
+#### **The Problem**
+- Every chapter in this course is one large module docstring split into `TODO:` sections with fenced code blocks.
+- A tool that needs the sections (search, example runner, renderer) would re-parse every chapter on every run, even when nothing changed.
+- **Solution**: Parse each file once into small records and store them in a cache keyed by the file's **modification time** and **content hash**. On the next run only the changed files are parsed again.
+
+#### **Cache Keys**
+- **`os.stat()`**: `st_mtime_ns` and `st_size` are free to read and catch almost every change.
+- **`hashlib`**: A content hash (e.g., SHA-256) catches the rare case where the time changes but the content does not (e.g., `touch`, `git checkout`), so the old records can be reused.
+- **Rule**:
+  - Same mtime and size → reuse the records without reading the file.
+  - Different mtime, same hash → reuse the records and store the new mtime.
+  - Different hash → parse the file again.
+
+#### **Parsing a Chapter into Records**
+- Sections are separated by lines of `=` characters; the first line of a section is its heading.
+- Each fenced Python block becomes one record with its chapter, section, block number, code and the expected values written as `# Output:` comments.
+- **Example**:
+  ```python
+  import re
+  import textwrap
+
+  TICKS = '`' * 3
+  SEPARATOR = re.compile(r'^=+$', re.M)
+  FENCE = re.compile(r'^([ \t]*)' + TICKS + r'python\n(.*?)^\1' + TICKS, re.S | re.M)
+
+  def parse_chapter(chapter, text):
+      records = []
+      for section in SEPARATOR.split(text.strip().strip('"')):
+          lines = [line for line in section.strip().splitlines() if line.strip()]
+          if not lines:
+              continue
+          title = lines[0].removeprefix('TODO:').strip()
+          for block, match in enumerate(FENCE.finditer(section)):
+              code = textwrap.dedent(match.group(2))
+              outputs = []
+              for line in code.splitlines():
+                  statement, marker, expected = line.partition('# Output:')
+                  if marker:
+                      outputs.append([statement.strip(), expected.strip()])
+              records.append({'chapter': chapter, 'section': title, 'block': block,
+                              'code': code, 'outputs': outputs})
+      return records
+  ```
+
+#### **Persisting the Catalog**
+- The cache is a single JSON file mapping each path to its key and records.
+- **Example**:
+  ```python
+  import glob
+  import hashlib
+  import json
+  import os
+
+  def load_catalog(paths, cache_path='.catalog_cache.json'):
+      try:
+          with open(cache_path, 'r', encoding='utf-8') as file:
+              cache = json.load(file)
+      except (FileNotFoundError, ValueError):
+          cache = {}
+
+      catalog, parsed = {}, []
+      for path in paths:
+          stat = os.stat(path)
+          entry = cache.get(path)
+          if entry and entry['mtime'] == stat.st_mtime_ns and entry['size'] == stat.st_size:
+              catalog[path] = entry  # Unchanged: no need to read the file
+              continue
+          with open(path, 'rb') as file:
+              data = file.read()
+          digest = hashlib.sha256(data).hexdigest()
+          if entry and entry['hash'] == digest:
+              entry = dict(entry)  # Only touched: keep the records, store the new mtime
+          else:
+              chapter = os.path.basename(os.path.dirname(path)) or path
+              entry = {'hash': digest, 'records': parse_chapter(chapter, data.decode('utf-8'))}
+              parsed.append(path)
+          entry.update(mtime=stat.st_mtime_ns, size=stat.st_size)
+          catalog[path] = entry
+
+      if catalog != cache:
+          with open(cache_path + '.tmp', 'w', encoding='utf-8') as file:
+              json.dump(catalog, file)
+          os.replace(cache_path + '.tmp', cache_path)  # Never leaves a half-written cache
+      return catalog, parsed
+
+  paths = sorted(glob.glob('Chapter */*.py'))
+  catalog, parsed = load_catalog(paths)
+  print(len(parsed), 'of', len(paths), 'files parsed')  # First run: every file
+  catalog, parsed = load_catalog(paths)
+  print(len(parsed), 'of', len(paths), 'files parsed')  # Second run: 0 files
+  ```
+
+#### **Looking Up Records**
+- Once loaded, lookups work on the small records instead of the raw text.
+- **Example**:
+  ```python
+  records = [record for entry in catalog.values() for record in entry['records']]
+  by_section = {}
+  for record in records:
+      by_section.setdefault((record['chapter'], record['section']), []).append(record)
+
+  for record in by_section.get(('Chapter 9', 'Generators and iterators?'), []):
+      print(record['block'], record['outputs'])
+  ```
+
+**Summary**:
+- Parse large files once into small records and keep them in an on-disk cache.
+- Use `mtime` and size as a cheap first check and a content hash as the real key, so a rerun only parses the files that actually changed.
+- Write the cache to a temporary file and `os.replace()` it, so a crash never leaves a broken cache behind.
+
+======================================================================================
+
+TODO:Running many code examples in parallel (timeouts, memory limits, sandboxes)?
+
+### **Running Many Code Examples in Parallel (Short Overview)**
+
+#### **The Problem**
+- The chapters contain hundreds of small examples (`check_value`, `count_up_to`, ...) that are never executed, so nobody knows which ones still run.
+- Running them one after another is slow, and a single example with an infinite loop or a huge allocation can hang or crash the whole run.
+
+#### **Design**
+- **One process per example**: Every snippet runs in a fresh interpreter (`subprocess.run`), so examples cannot affect each other and a crash only fails that snippet.
+- **Parallelism**: A `ThreadPoolExecutor` starts up to `os.cpu_count()` interpreters at once. The threads only wait for the child processes, so the GIL is not a problem.
+- **Sandbox**:
+  - **Timeout**: `subprocess.run(..., timeout=...)` kills examples that run too long.
+  - **Memory cap**: `resource.setrlimit(resource.RLIMIT_AS, ...)` limits the child's address space (Unix only). A small bootstrap sets it inside the child before running the snippet; `subprocess`'s `preexec_fn` is not safe to use from threads.
+  - **Working directory**: Each snippet gets its own `tempfile.TemporaryDirectory()`, so files like `data.csv` or `example.txt` never touch the project.
+  - **Isolated mode**: `python -I` ignores environment variables and the user's site-packages.
+
+#### **The Runner**
+- **Example**:
+  ```python
+  import os
+  import subprocess
+  import sys
+  import tempfile
+  import time
+  from concurrent.futures import ThreadPoolExecutor
+
+  BOOTSTRAP = '\n'.join([  # Runs in the child: set the memory cap, then run the snippet
+      'import sys',
+      'try:',
+      '    import resource',
+      '    resource.setrlimit(resource.RLIMIT_AS, (int(sys.argv[1]), int(sys.argv[1])))',
+      'except ImportError:',  # Windows
+      '    pass',
+      'code = sys.argv[2]',
+      'del sys.argv[1:]',
+      'exec(compile(code, "<snippet>", "exec"), {"__name__": "__main__"})',
+  ])
+
+  def run_snippet(name, code, timeout=10, max_memory=512 * 1024 * 1024):
+      start = time.perf_counter()
+      with tempfile.TemporaryDirectory() as workdir:
+          try:
+              result = subprocess.run([sys.executable, '-I', '-c', BOOTSTRAP, str(max_memory), code],
+                                      cwd=workdir, capture_output=True, text=True, timeout=timeout)
+              status = 'ok' if result.returncode == 0 else 'failed'
+              error = result.stderr.strip().splitlines()[-1:]
+          except subprocess.TimeoutExpired:
+              status, error = 'timeout', ['timed out after %ss' % timeout]
+      return {'name': name, 'status': status, 'error': ''.join(error),
+              'seconds': time.perf_counter() - start}
+
+  def run_all(snippets, workers=None, **limits):
+      workers = workers or os.cpu_count()
+      with ThreadPoolExecutor(max_workers=workers) as executor:
+          futures = [executor.submit(run_snippet, name, code, **limits) for name, code in snippets]
+          return [future.result() for future in futures]
+  ```
+
+- **Usage**:
+  ```python
+  snippets = [
+      ('count_up_to', 'def count_up_to(n):\n    yield from range(1, n + 1)\nprint(list(count_up_to(3)))'),
+      ('zero_division', 'print(10 / 0)'),
+      ('endless_loop', 'while True:\n    pass'),
+      ('huge_list', 'data = [0] * 10 ** 10'),
+  ]
+
+  start = time.perf_counter()
+  results = run_all(snippets, timeout=2)
+  for result in sorted(results, key=lambda r: r['seconds'], reverse=True):
+      print('%-14s %-8s %6.3fs  %s' % (result['name'], result['status'], result['seconds'], result['error']))
+  print('Total wall time: %.2fs' % (time.perf_counter() - start))
+  ```
+  - `count_up_to` passes, `zero_division` fails with a `ZeroDivisionError`, `endless_loop` is killed by the timeout and `huge_list` fails with a `MemoryError` instead of exhausting the machine.
+  - The total wall time is close to the slowest snippet, not the sum of all of them.
+
+- **With the chapter catalog** (see "Caching parsed files on disk" above):
+  ```python
+  snippets = [('%s / %s #%d' % (r['chapter'], r['section'], r['block']), r['code'])
+              for entry in catalog.values() for r in entry['records']]
+  failed = [r for r in run_all(snippets) if r['status'] != 'ok']
+  print(len(snippets) - len(failed), 'of', len(snippets), 'examples run')
+  ```
+
+**Summary**:
+- Run every example in its own interpreter with a timeout, a memory limit and a temporary working directory.
+- Use a thread pool to keep all CPU cores busy with child processes, and record the wall time of each snippet to find the slow ones.
+
+======================================================================================
+
+TODO:Incremental builds with fingerprints and dependency graphs?
+
+### **Incremental Builds (Short Overview)**
+
+#### **The Problem**
+- Rendering all chapters to HTML or Markdown for a website regenerates every page, even when only one section changed.
+- **Incremental build**: Remember a **fingerprint** (content hash) of every input, and rebuild only the outputs whose inputs changed.
+
+#### **Key Ideas**
+- **Fingerprints**: A `hashlib` digest of each `TODO:` section and of each code block. Code blocks are the expensive part to render, so they get their own cache and are only rendered when their code changes.
+- **Dependency graph**: A section that links to another section (written as `[[Section title]]`) depends on the title and URL of the target. If the target is renamed, added or removed, only the pages linking to it are rebuilt.
+- **Manifest**: A JSON file storing the fingerprint of every output from the last build.
+- **Atomic writes**: Each page is written to a temporary file in the same directory and moved into place with `os.replace()`, so readers never see a half-written page and a crash never leaves a broken site.
+
+#### **The Build Pipeline**
+- **Example**:
+  ```python
+  import hashlib
+  import html
+  import json
+  import os
+  import re
+  import tempfile
+  import textwrap
+
+  TICKS = '`' * 3
+  FENCE = re.compile(r'^([ \t]*)' + TICKS + r'python\n(.*?)^\1' + TICKS + r'[ \t]*$', re.S | re.M)
+  LINK = re.compile(re.escape('[[') + '(.+?)' + re.escape(']]'))
+
+  def fingerprint(*parts):
+      return hashlib.sha256('\0'.join(parts).encode('utf-8')).hexdigest()
+
+  def slug(text):
+      return re.sub(r'[^a-z0-9]+', '-', text.lower()).strip('-')
+
+  def write_atomic(path, text):
+      os.makedirs(os.path.dirname(path), exist_ok=True)
+      with tempfile.NamedTemporaryFile('w', dir=os.path.dirname(path), delete=False, encoding='utf-8') as file:
+          file.write(text)
+      os.chmod(file.name, 0o644)  # Temporary files are private (0600); pages must be readable by the web server
+      os.replace(file.name, path)
+
+  def render_prose(text, urls):
+      def link(match):
+          title = match.group(1)
+          if title not in urls:
+              return html.escape(title)
+          return '<a href="../%s">%s</a>' % (urls[title], html.escape(title))
+      return ''.join('<p>%s</p>\n' % LINK.sub(link, html.escape(paragraph, quote=False))
+                     for paragraph in text.split('\n\n') if paragraph.strip())
+
+  def render_section(title, text, urls, blocks, stats):
+      parts, start = ['<h2>%s</h2>\n' % html.escape(title)], 0
+      for match in FENCE.finditer(text):
+          parts.append(render_prose(text[start:match.start()], urls))
+          code = textwrap.dedent(match.group(2))
+          key = fingerprint(code)
+          if key not in blocks:
+              blocks[key] = '<pre><code class="language-python">%s</code></pre>\n' % html.escape(code)
+              stats['blocks rendered'] += 1
+          parts.append(blocks[key])
+          start = match.end()
+      parts.append(render_prose(text[start:], urls))
+      return ''.join(parts)
+
+  def build_site(sections, out_dir='site'):
+      manifest_path = os.path.join(out_dir, '.manifest.json')
+      try:
+          with open(manifest_path, 'r', encoding='utf-8') as file:
+              manifest = json.load(file)
+      except (FileNotFoundError, ValueError):
+          manifest = {'pages': {}, 'blocks': {}}
+
+      urls = {title: '%s/%s.html' % (slug(chapter), slug(title)) for chapter, title, text in sections}
+      graph = {title: sorted(set(LINK.findall(text))) for chapter, title, text in sections}
+      stats = {'pages built': 0, 'pages skipped': 0, 'blocks rendered': 0}
+      pages, used_blocks = {}, set()
+
+      for chapter, title, text in sections:
+          links = ['%s=%s' % (target, urls.get(target, '')) for target in graph[title]]
+          key = fingerprint(text, *links)
+          old = manifest['pages'].get(urls[title])
+          if old == key and os.path.exists(os.path.join(out_dir, urls[title])):
+              stats['pages skipped'] += 1
+          else:
+              body = render_section(title, text, urls, manifest['blocks'], stats)
+              write_atomic(os.path.join(out_dir, urls[title]), body)
+              stats['pages built'] += 1
+          pages[urls[title]] = key
+          used_blocks.update(fingerprint(textwrap.dedent(m.group(2))) for m in FENCE.finditer(text))
+
+      index_key = fingerprint(*sorted(urls.values()))
+      if manifest['pages'].get('index.html') != index_key:
+          items = ''.join('<li><a href="%s">%s</a></li>\n' % (url, html.escape(title)) for title, url in urls.items())
+          write_atomic(os.path.join(out_dir, 'index.html'), '<ul>\n%s</ul>\n' % items)
+          stats['pages built'] += 1
+      pages['index.html'] = index_key
+
+      for url in set(manifest['pages']) - set(pages):  # Sections that were removed
+          if os.path.exists(os.path.join(out_dir, url)):
+              os.remove(os.path.join(out_dir, url))
+      manifest = {'pages': pages, 'blocks': {k: v for k, v in manifest['blocks'].items() if k in used_blocks}}
+      write_atomic(manifest_path, json.dumps(manifest))
+      return stats
+  ```
+
+#### **Usage**
+- **Example**:
+  ```python
+  sections = [
+      ('Chapter 9', 'Generators and iterators?', 'Use yield.\n\n' + TICKS + 'python\nyield 1\n' + TICKS),
+      ('Chapter 9', 'Coroutines?', 'Coroutines build on [[Generators and iterators?]].'),
+      ('Chapter 5', 'Binary files?', 'Open files in binary mode.'),
+  ]
+  print(build_site(sections))  # Output: {'pages built': 4, 'pages skipped': 0, 'blocks rendered': 1}
+  print(build_site(sections))  # Output: {'pages built': 0, 'pages skipped': 3, 'blocks rendered': 0}
+
+  sections[2] = ('Chapter 5', 'Binary files?', 'Open files with the b mode.')
+  print(build_site(sections))  # Output: {'pages built': 1, 'pages skipped': 2, 'blocks rendered': 0}
+
+  # Renaming a section rebuilds it, the index and the pages linking to it (the link target is gone)
+  sections[0] = ('Chapter 9', 'Generators?', sections[0][2])
+  print(build_site(sections))  # Output: {'pages built': 3, 'pages skipped': 1, 'blocks rendered': 0}
+  ```
+
+**Summary**:
+- Fingerprint every section and code block, keep the fingerprints in a manifest, and rebuild only what changed.
+- Include the title and URL of linked sections in a page's fingerprint, so the dependency graph updates cross-links without a full rebuild.
+- Write every output atomically with a temporary file and `os.replace()`.
+
+======================================================================================
+
+TODO:Finding dependencies between code examples (def/use analysis with ast)?
+
+### **Finding Dependencies Between Code Examples (Short Overview)**
+
+#### **The Problem**
+- Some examples build on earlier ones in the same section: in "Working with dates and times" the `date` example defines `today`, and the `timedelta` example uses it (`tomorrow = today + timedelta(days=1)`).
+- Run separately (as the parallel runner above does), the second example fails with a `NameError` even though the chapter is correct. Run everything in one interpreter instead, and nothing runs in parallel.
+- **Solution**: Analyze the code statically, find which names each snippet **defines** and which ones it **uses**, and chain only the snippets that really depend on each other.
+
+#### **Definitions and Uses with `ast`**
+- The statements of the snippet are visited **in the order they run**:
+  - **Defined**: names assigned at module level (`ast.Name` with `ast.Store`), functions, classes, imports and `except ... as` names. Names assigned inside functions, lambdas, classes and comprehensions are local and are not visible to other snippets.
+  - **Used**: names that are read (`ast.Name` with `ast.Load`). In `total = total + 5` the right side runs first, and `total += 1` reads `total` before it writes it, so both use `total`.
+  - **Free names**: read before the snippet itself defines them, not a parameter and not a built-in like `print`. A function body only runs when it is called, so the names it reads are free only if the snippet defines them nowhere.
+- **Example**:
+  ```python
+  import ast
+  import builtins
+
+  BUILTINS = set(dir(builtins))
+  FUNCTIONS = (ast.FunctionDef, ast.AsyncFunctionDef, ast.Lambda)
+  COMPREHENSIONS = (ast.ListComp, ast.SetComp, ast.DictComp, ast.GeneratorExp)
+
+  def stored(nodes):
+      names = set()
+      for node in nodes:
+          for child in ast.walk(node):
+              if isinstance(child, ast.Name) and isinstance(child.ctx, ast.Store):
+                  names.add(child.id)
+              elif isinstance(child, ast.arg):
+                  names.add(child.arg)
+              elif isinstance(child, (ast.FunctionDef, ast.AsyncFunctionDef, ast.ClassDef)):
+                  names.add(child.name)
+              elif isinstance(child, (ast.Import, ast.ImportFrom)):
+                  names.update((alias.asname or alias.name).split('.')[0] for alias in child.names)
+              elif isinstance(child, ast.ExceptHandler) and child.name:
+                  names.add(child.name)
+      return names
+
+  def def_use(code):
+      defined, free, later = set(), set(), set()
+
+      def define(names, local):
+          if local is None:  # Only module-level names are visible to other snippets
+              defined.update(names)
+
+      def use(name, local, deferred):
+          if local is not None and name in local:
+              return
+          if deferred:
+              later.add(name)  # Read when the function is called, after the whole snippet ran
+          elif name not in defined:
+              free.add(name)  # Read before the snippet defines it
+
+      def visit(node, local=None, deferred=False):
+          if isinstance(node, ast.Name):
+              if isinstance(node.ctx, ast.Load):
+                  use(node.id, local, deferred)
+              elif isinstance(node.ctx, ast.Store):
+                  define([node.id], local)
+          elif isinstance(node, FUNCTIONS):
+              arguments = node.args
+              for child in (getattr(node, 'decorator_list', []) + arguments.defaults
+                            + [default for default in arguments.kw_defaults if default is not None]):
+                  visit(child, local, deferred)
+              body = node.body if isinstance(node.body, list) else [node.body]
+              inner = (local or set()) | stored([arguments] + body)
+              for child in body:
+                  visit(child, inner, True)
+              if not isinstance(node, ast.Lambda):
+                  define([node.name], local)
+          elif isinstance(node, ast.ClassDef):
+              for child in node.decorator_list + node.bases + node.keywords:
+                  visit(child, local, deferred)
+              inner = (local or set()) | stored(node.body)
+              for child in node.body:
+                  visit(child, inner, deferred)
+              define([node.name], local)
+          elif isinstance(node, COMPREHENSIONS):
+              generators = node.generators
+              visit(generators[0].iter, local, deferred)  # Runs in the enclosing scope
+              inner = (local or set()) | stored(generator.target for generator in generators)
+              for generator in generators:
+                  if generator is not generators[0]:
+                      visit(generator.iter, inner, deferred)
+                  for condition in generator.ifs:
+                      visit(condition, inner, deferred)
+              for child in ([node.key, node.value] if isinstance(node, ast.DictComp) else [node.elt]):
+                  visit(child, inner, deferred)
+          elif isinstance(node, (ast.Assign, ast.AnnAssign, ast.NamedExpr)):
+              if node.value is not None:  # `x: int` alone binds nothing
+                  visit(node.value, local, deferred)
+                  for target in (node.targets if isinstance(node, ast.Assign) else [node.target]):
+                      visit(target, local, deferred)
+          elif isinstance(node, ast.AugAssign):
+              visit(node.value, local, deferred)
+              if isinstance(node.target, ast.Name):
+                  use(node.target.id, local, deferred)  # total += 1 reads total first
+              visit(node.target, local, deferred)
+          elif isinstance(node, (ast.For, ast.AsyncFor)):
+              for child in [node.iter, node.target] + node.body + node.orelse:
+                  visit(child, local, deferred)
+          elif isinstance(node, (ast.Import, ast.ImportFrom)):
+              define(((alias.asname or alias.name).split('.')[0] for alias in node.names), local)
+          elif isinstance(node, ast.ExceptHandler):
+              if node.type is not None:
+                  visit(node.type, local, deferred)
+              if node.name:
+                  define([node.name], local)
+              for child in node.body:
+                  visit(child, local, deferred)
+          else:
+              for child in ast.iter_child_nodes(node):
+                  visit(child, local, deferred)
+
+      visit(ast.parse(code))
+      return defined, (free | (later - defined)) - BUILTINS
+
+  defined, free = def_use('tomorrow = today + timedelta(days=1)')
+  print(sorted(defined), sorted(free))  # Output: ['tomorrow'] ['timedelta', 'today']
+  defined, free = def_use('total = total + 5\nsquares = [n * n for n in range(total)]')
+  print(sorted(defined), sorted(free))  # Output: ['squares', 'total'] ['total']
+  ```
+
+#### **Building the Graph and the Schedule**
+- Going through the snippets in order, every free name is linked to the **latest earlier snippet of the same section** that defines it.
+- Snippets connected by these links form a **chain** that runs in one interpreter, in the original order. Every chain is independent of the others, so all chains can run in parallel.
+- A union-find structure (`parent` list) groups the connected snippets.
+- **Example**:
+  ```python
+  def schedule(snippets):
+      parent = list(range(len(snippets)))
+
+      def find(i):
+          while parent[i] != i:
+              parent[i] = parent[parent[i]]
+              i = parent[i]
+          return i
+
+      providers, edges = {}, []
+      for i, (section, name, code) in enumerate(snippets):
+          try:
+              defined, free = def_use(code)
+          except SyntaxError:
+              continue  # Runs on its own and reports its own error
+          for variable in sorted(free):
+              j = providers.get((section, variable))
+              if j is not None:
+                  parent[find(i)] = find(j)
+                  edges.append((snippets[j][1], name, variable))
+          for variable in defined:
+              providers[(section, variable)] = i
+
+      chains = {}
+      for i in range(len(snippets)):
+          chains.setdefault(find(i), []).append(i)
+      jobs = [(' + '.join(snippets[i][1] for i in chain), '\n\n'.join(snippets[i][2] for i in chain))
+              for chain in chains.values()]
+      return jobs, edges
+  ```
+
+#### **Usage**
+- **Example**:
+  ```python
+  dates = 'Working with dates and times'
+  snippets = [
+      (dates, 'date', 'from datetime import date\ntoday = date.today()'),
+      (dates, 'time', 'from datetime import time\nprint(time(14, 30, 45))'),
+      (dates, 'datetime', 'from datetime import datetime\nnow = datetime.now()'),
+      (dates, 'strftime', 'print(now.strftime("%Y-%m-%d"))'),
+      (dates, 'timedelta', 'from datetime import timedelta\ntomorrow = today + timedelta(days=1)'),
+      (dates, 'difference', 'print(tomorrow - today)'),
+  ]
+
+  jobs, edges = schedule(snippets)
+  for provider, user, variable in edges:
+      print('%s -> %s (%s)' % (provider, user, variable))
+  for name, code in jobs:
+      print('job:', name)
+  # Output: job: date + timedelta + difference
+  #         job: time
+  #         job: datetime + strftime
+
+  counter = 'Counting'
+  jobs, edges = schedule([(counter, 'start', 'total = 10'), (counter, 'add', 'total = total + 5'),
+                          (counter, 'increment', 'total += 1')])
+  print([name for name, code in jobs])  # Output: ['start + add + increment']
+  ```
+  - The three jobs can be passed to `run_all()` from "Running many code examples in parallel" above: they run concurrently, and none of them fails with a `NameError`.
+
+**Summary**:
+- Use `ast` to find, in the order the statements run, the names each snippet defines at module level and the names it reads before defining them.
+- Link every free name to the snippet that last defined it in the same section, group linked snippets with union-find, and run each group as one chain.
+- Independent chains run in parallel, dependent snippets share one interpreter, so there are no false failures.
+
+======================================================================================
+
 """
\ No newline at end of file